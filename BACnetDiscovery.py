@@ -1,9 +1,45 @@
+import logging
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import BAC0
-import requests
 
-from utils import utilClass, propertyNameForId, ConfigManager, protocolServices
+from logBackend import setupLogging, stopLogging, RateLimitedProgress
+from metrics import metrics, InstrumentedBacnet
+from utils import utilClass, ConfigManager, SchemeTimestamp, ObjectListStream, protocolServices, propertyIdForName, requiredPropertiesForType, optionalPropertiesForType
 from patterns import *
+from propertyCache import PropertyListCache
+from publisher import AASPublisher, PublishState
+from exporter import AASExporter
+from scanRecords import ScanRecordStore, hashObjectList
+from scanJournal import ScanJournal
+from transport import RecordingTransport, ReplayTransport
+from liveData import LiveDataPoller
+from scheduler import RequestScheduler
+from sharding import splitDevices, ShardContext, ShardJournal, ShardProcesses
+
+DISCOVERY_POLL_INTERVAL = 0.2
+MAX_WHOIS_RANGES = 32
+
+# Estimated encoded size of one object's propertyList inside a ReadPropertyMultiple-ACK
+RPM_PROPERTY_LIST_SIZE = 96
+RPM_ACK_OVERHEAD = 16
+MAX_RPM_OBJECTS = 64
+SEGMENTED_RESPONSES = ("segmentedBoth", "segmentedTransmit")
+
+# Estimated encoded size of one objectList element inside a ReadPropertyMultiple-ACK and of the objectIdentifier
+# in a ReadProperty-ACK of the whole objectList
+RPM_OBJECT_LIST_ELEMENT_SIZE = 12
+OBJECT_IDENTIFIER_SIZE = 5
+# Longer objectLists are read in chunks even from devices that support segmentation
+MAX_WHOLE_OBJECT_LIST = 1000
+
+PROBE_PROPERTIES_PER_RPM = 24
+# Probed for proprietary object types, for which no standard property set is known
+COMMON_PROPERTIES = ["presentValue", "description", "statusFlags", "eventState", "reliability", "outOfService",
+                     "units"]
 
 def getArgs(args):
     pathConfig = None
@@ -38,6 +74,38 @@ def getArgs(args):
     else:
         wantedBacnetDevices = configManager.getDevicesList()
 
+    overrideOptionFromArgs(args, "-workers", "workers", configManager)
+    overrideOptionFromArgs(args, "-propertyProbing", "propertyProbing", configManager)
+    overrideOptionFromArgs(args, "-propertyCache", "propertyCache", configManager)
+    overrideOptionFromArgs(args, "-scanRecords", "scanRecords", configManager)
+    overrideOptionFromArgs(args, "-discoveryTimeout", "discoveryTimeout", configManager)
+    overrideOptionFromArgs(args, "-publishConcurrency", "publishConcurrency", configManager)
+    overrideOptionFromArgs(args, "-httpTimeout", "httpTimeout", configManager)
+    overrideOptionFromArgs(args, "-publishTries", "publishTries", configManager)
+    overrideOptionFromArgs(args, "-streamThreshold", "streamThreshold", configManager)
+    overrideOptionFromArgs(args, "-publishState", "publishState", configManager)
+    overrideOptionFromArgs(args, "-metrics", "metrics", configManager)
+    overrideOptionFromArgs(args, "-journal", "journal", configManager)
+    overrideOptionFromArgs(args, "-requestLimit", "requestLimit", configManager)
+    overrideOptionFromArgs(args, "-shards", "shards", configManager)
+    overrideOptionFromArgs(args, "-pollInterval", "pollInterval", configManager)
+    if "-cov" in args:
+        configManager.overrideOption("cov", True)
+    if "-export" in args:
+        try:
+            configManager.overrideOption("export", {
+                "directory": args[args.index("-export") + 1],
+                "format": args[args.index("-exportFormat") + 1] if "-exportFormat" in args else "json"
+            })
+        except IndexError:
+            utilClass.doPrint("No value provided for -export and therefor ignored.")
+    if "-streaming" in args:
+        configManager.overrideOption("streamingDiscovery", True)
+    overrideOptionFromArgs(args, "-logLevel", "logLevel", configManager)
+    overrideOptionFromArgs(args, "-logFormat", "logFormat", configManager)
+    overrideOptionFromArgs(args, "-logFile", "logFile", configManager)
+    setupLogging(**configManager.getLogSettings())
+
     if len(wantedBacnetDevices) == 0:
         utilClass.doPrint("Looking for all BACnet devices\n", newline=True)
     else:
@@ -45,6 +113,13 @@ def getArgs(args):
 
     return pathConfig, wantedBacnetDevices, configManager
 
+def overrideOptionFromArgs(args, argName, optionName, configManager):
+    if argName in args:
+        try:
+            configManager.overrideOption(optionName, args[args.index(argName) + 1])
+        except IndexError:
+            utilClass.doPrint(f"No value provided for {argName} and therefor ignored.")
+
 def getServicesSupported(ipAddress, deviceId):
     try:
         servicesSupported = bacnet.read(f"{ipAddress} device {deviceId} 97")
@@ -53,46 +128,543 @@ def getServicesSupported(ipAddress, deviceId):
     except BAC0.core.io.IOExceptions.UnknownPropertyError as e:
         return []
 
+def readDeviceProperty(ipAddress, deviceId, propertyName, default):
+    try:
+        return bacnet.read(f"{ipAddress} device {deviceId} {propertyName}")
+    except (BAC0.core.io.IOExceptions.UnknownPropertyError, BAC0.core.io.IOExceptions.NoResponseFromController):
+        return default
+
+
+def getRpmBatchSize(ipAddress, deviceId, servicesSupported):
+    if "readPropertyMultiple" not in servicesSupported:
+        return 1
+
+    segmentation = str(readDeviceProperty(ipAddress, deviceId, "segmentationSupported", "noSegmentation"))
+    if segmentation in SEGMENTED_RESPONSES:
+        return MAX_RPM_OBJECTS
+
+    maxApdu = getMaxApdu(ipAddress, deviceId)
+    return max(1, min(MAX_RPM_OBJECTS, (maxApdu - RPM_ACK_OVERHEAD) // RPM_PROPERTY_LIST_SIZE))
+
+
+def getDeviceModel(ipAddress, deviceId):
+    deviceModel = tuple(readDeviceProperty(ipAddress, deviceId, propertyName, None)
+                        for propertyName in ("vendorIdentifier", "modelName", "firmwareRevision"))
+    if None in deviceModel:
+        return None
+    return deviceModel
+
+
+def getMaxApdu(ipAddress, deviceId):
+    try:
+        return int(readDeviceProperty(ipAddress, deviceId, "maxApduLengthAccepted", 480))
+    except (TypeError, ValueError):
+        return 480
+
+
+def readObjectList(ipAddress, deviceId, servicesSupported):
+    """Returns the objectList as ObjectListStream. Short lists are read at once, long lists and lists whose
+    response would need segmentation that the device does not support are read in chunks of array indexes."""
+    try:
+        length = int(bacnet.read(f"{ipAddress} device {deviceId} objectList", arr_index=0))
+    except (TypeError, ValueError,
+            BAC0.core.io.IOExceptions.UnknownPropertyError,
+            BAC0.core.io.IOExceptions.NoResponseFromController):
+        objectList = bacnet.read(f"{ipAddress} device {deviceId} objectList")
+        return ObjectListStream(len(objectList), objectList)
+
+    maxApdu = getMaxApdu(ipAddress, deviceId)
+    segmentation = str(readDeviceProperty(ipAddress, deviceId, "segmentationSupported", "noSegmentation"))
+    if length <= MAX_WHOLE_OBJECT_LIST and (segmentation in SEGMENTED_RESPONSES
+                                            or length * OBJECT_IDENTIFIER_SIZE + RPM_ACK_OVERHEAD <= maxApdu):
+        try:
+            objectList = bacnet.read(f"{ipAddress} device {deviceId} objectList")
+            return ObjectListStream(len(objectList), objectList)
+        except (ValueError,
+                BAC0.core.io.IOExceptions.SegmentationNotSupported,
+                BAC0.core.io.IOExceptions.NoResponseFromController):
+            metrics.inc("bacnet_retries_total", device=ipAddress)
+
+    if "readPropertyMultiple" in servicesSupported:
+        chunkSize = max(1, (maxApdu - RPM_ACK_OVERHEAD) // RPM_OBJECT_LIST_ELEMENT_SIZE)
+        utilClass.doPrint(f"Reading objectList of {length} objects with ReadPropertyMultiple, {chunkSize} per request")
+    else:
+        chunkSize = 1
+        utilClass.doPrint(f"Reading objectList of {length} objects one by one")
+    return ObjectListStream(length, iterObjectListChunks(ipAddress, deviceId, length, chunkSize))
+
+
+def iterObjectListChunks(ipAddress, deviceId, length, chunkSize):
+    for start in range(1, length + 1, chunkSize):
+        for object in readObjectListChunk(ipAddress, deviceId, list(range(start, min(start + chunkSize, length + 1)))):
+            yield object
+
+
+def readObjectListChunk(ipAddress, deviceId, indexes):
+    if len(indexes) <= 1:
+        return [object for index in indexes for object in readObjectListElement(ipAddress, deviceId, index)]
+
+    request = {
+        "address": ipAddress,
+        "objects": {f"device:{deviceId}": [f"objectList@idx:{index}" for index in indexes]}
+    }
+    try:
+        result = bacnet.readMultiple("", request_dict=request)
+    except BAC0.core.io.IOExceptions.UnrecognizedService:
+        return [object for index in indexes for object in readObjectListElement(ipAddress, deviceId, index)]
+    except (ValueError,
+            BAC0.core.io.IOExceptions.SegmentationNotSupported,
+            BAC0.core.io.IOExceptions.UnknownObjectError):
+        return splitObjectListChunk(ipAddress, deviceId, indexes)
+
+    if type(result) != dict or len(result) != 1:
+        # BAC0 returns the same for a timeout as for an abort, e.g. of a too long response. The first element is read
+        # alone before splitting: if the device does not answer that either, NoResponseFromController aborts it.
+        objects = readObjectListElement(ipAddress, deviceId, indexes[0])
+        return objects + splitObjectListChunk(ipAddress, deviceId, indexes[1:])
+
+    # The results are in the order of the requested indexes
+    objects = []
+    for index, (propertyIdentifier, value) in zip(indexes, list(result.values())[0]):
+        if value is None:
+            objects += readObjectListElement(ipAddress, deviceId, index)
+        else:
+            objects.append(value)
+    return objects
+
+
+def splitObjectListChunk(ipAddress, deviceId, indexes):
+    metrics.inc("bacnet_retries_total", device=ipAddress)
+    middle = len(indexes) // 2
+    return readObjectListChunk(ipAddress, deviceId, indexes[:middle]) + \
+        readObjectListChunk(ipAddress, deviceId, indexes[middle:])
+
+
+def readObjectListElement(ipAddress, deviceId, index):
+    # NoResponseFromController is passed on, a device that stopped answering is not browsed further
+    try:
+        return [bacnet.read(f"{ipAddress} device {deviceId} objectList", arr_index=index)]
+    except (ValueError,
+            BAC0.core.io.IOExceptions.UnknownPropertyError) as e:
+        utilClass.doPrint(f"objectList element {index} could not be read and is skipped: {e!r}",
+                          level=logging.WARNING)
+        return []
+
+
+def getIncrementalScanState(ipAddress, deviceId, servicesSupported):
+    if scanRecords is None:
+        return readObjectList(ipAddress, deviceId, servicesSupported), {}, None
+
+    record = scanRecords.get(deviceId)
+    databaseRevision = readDeviceProperty(ipAddress, deviceId, "databaseRevision", None)
+    if record is not None and record["address"] == ipAddress and databaseRevision is not None \
+            and record["databaseRevision"] == databaseRevision:
+        utilClass.doPrint(f"databaseRevision {databaseRevision} unchanged since last scan, reusing it")
+        return [tuple(object) for object in record["objectList"]], record["propertyLists"], databaseRevision
+
+    objectList = readObjectList(ipAddress, deviceId, servicesSupported)
+    if record is None:
+        return objectList, {}, databaseRevision
+
+    if not objectList.isComplete():
+        # Comparing would read the whole objectList before browsing. Property lists of objects that are no longer
+        # in it are just not used.
+        utilClass.doPrint("databaseRevision changed since last scan, reusing property lists of objects still in the objectList")
+        return objectList, record["propertyLists"], databaseRevision
+
+    if hashObjectList(objectList) == record["objectListHash"]:
+        utilClass.doPrint("objectList unchanged since last scan, reusing its property lists")
+        return objectList, record["propertyLists"], databaseRevision
+
+    objectIdentifiers = set(getObjectIdentifier(object) for object in objectList)
+    knownPropertyLists = {objectIdentifier: propertyList
+                          for objectIdentifier, propertyList in record["propertyLists"].items()
+                          if objectIdentifier in objectIdentifiers}
+    utilClass.doPrint(f"objectList changed since last scan, reusing property lists of {len(knownPropertyLists)} objects")
+    return objectList, knownPropertyLists, databaseRevision
+
+
 def main():
-    global bacnet, configManager
+    global bacnet, configManager, propertyCache, scanRecords, journal, publisher, poller, shard
     args = sys.argv[1:]
     pathConfig, wantedBacnetDevices, configManager = getArgs(args)
 
-    urlServer = configManager.getServerUrl()
+    propertyCache = None
+    propertyCacheSettings = configManager.getPropertyCacheSettings()
+    if propertyCacheSettings is not None:
+        propertyCache = PropertyListCache(**propertyCacheSettings)
+        if "-invalidatePropertyCache" in args:
+            utilClass.doPrint(f"Invalidating property list cache '{propertyCache.path}'")
+            propertyCache.invalidate()
+
+    scanRecords = None
+    scanRecordsDirectory = configManager.getScanRecordsDirectory()
+    if scanRecordsDirectory is not None:
+        scanRecords = ScanRecordStore(scanRecordsDirectory, ignoreExisting="-fullRescan" in args)
+
+    journal = None
+    journalPath = configManager.getJournalPath()
+    if journalPath is not None:
+        journal = ScanJournal(journalPath, resume="-resume" in args)
+    elif "-resume" in args:
+        utilClass.doPrint("-resume needs a journal and is ignored", level=logging.WARNING)
+
+    exportSettings = configManager.getExportSettings()
+    if exportSettings is not None:
+        urlServer = None
+        publisher = AASExporter(**exportSettings, streamThreshold=configManager.getStreamThreshold())
+    else:
+        urlServer = configManager.getServerUrl()
+        publishState = None
+        publishStateSettings = configManager.getPublishStateSettings()
+        if publishStateSettings is not None:
+            publishState = PublishState(**publishStateSettings)
+        publisher = AASPublisher(urlServer, configManager.getPublishConcurrency(), configManager.getHttpTimeout(),
+                                 configManager.getPublishTries(), streamThreshold=configManager.getStreamThreshold(), publishState=publishState)
+
+    shard = None
+    shardSettings = configManager.getShardSettings()
+    if shardSettings is not None and ("-record" in args or "-replay" in args):
+        utilClass.doPrint("Sharding is disabled while recording or replaying", level=logging.WARNING)
+        shardSettings = None
+
+    transport = connectTransport(args)
+    bacnet = RequestScheduler(InstrumentedBacnet(transport), **configManager.getRequestLimitSettings())
+
+    poller = None
+    if "-poll" in args or "-cov" in args:
+        if urlServer is None:
+            utilClass.doPrint("Live data polling needs an AAS server and is disabled while exporting",
+                              level=logging.WARNING)
+        else:
+            poller = LiveDataPoller(bacnet, publisher, workers=configManager.getWorkers(),
+                                    **configManager.getLiveDataSettings())
+    try:
+        browseNetwork(wantedBacnetDevices, urlServer, shardSettings, args)
+        if journal is not None:
+            journal.close()
+            journal = None
+        if poller is not None:
+            pollLiveData(args)
+    finally:
+        if journal is not None:
+            journal.close()
+        publisher.close()
+        if isinstance(transport, (RecordingTransport, ReplayTransport)):
+            transport.close()
+        limits = bacnet.getLimits()
+        if len(limits) > 0:
+            utilClass.doPrint("Outstanding request limits: " + ", ".join(f"{network}: {limit}" for network, limit in limits.items()),
+                              level=logging.DEBUG, limits=limits)
+        writeMetrics("scan")
+
+
+def connectTransport(args):
+    try:
+        if "-replay" in args:
+            path = args[args.index("-replay") + 1]
+            utilClass.doPrint(f"Replaying BACnet responses from '{path}', the network is not accessed")
+            return ReplayTransport(path)
+        if "-record" in args:
+            path = args[args.index("-record") + 1]
+            utilClass.doPrint(f"Recording BACnet requests and responses to '{path}'")
+            return RecordingTransport(BAC0.connect(), path)
+    except IndexError:
+        utilClass.doPrint("No file provided for -record or -replay and therefor ignored.")
+    return BAC0.connect()
+
 
-    bacnet = BAC0.connect()
-    bacnet.whois()
-    deviceIdsFound = [device[3] for device in bacnet.devices]
+def pollLiveData(args):
+    duration = None
+    if "-pollDuration" in args:
+        try:
+            duration = float(args[args.index("-pollDuration") + 1])
+        except (IndexError, ValueError):
+            utilClass.doPrint("No valid value provided for -pollDuration and therefor ignored.")
+    utilClass.doPrint("Polling live data" + (f" for {duration:g} s" if duration is not None else ", stop with Ctrl+C"),
+                      newline=True)
+    try:
+        with metrics.timer("scan_phase_duration_seconds", phase="liveData"):
+            poller.run(duration)
+    except KeyboardInterrupt:
+        utilClass.doPrint("Live data polling stopped")
+
+
+def writeMetrics(name):
+    metricsDirectory = configManager.getMetricsDirectory()
+    if metricsDirectory is not None:
+        metrics.write(metricsDirectory, name)
+        utilClass.doPrint(f"Metrics written to '{metricsDirectory}'")
+
+
+def browseNetwork(wantedBacnetDevices, urlServer, shardSettings=None, args=()):
+    if configManager.getStreamingDiscovery():
+        if shardSettings is None:
+            printTarget(urlServer)
+            browseStreaming(wantedBacnetDevices, urlServer)
+            return
+        utilClass.doPrint("Streaming discovery is not used with shards, the devices are split after the discovery")
+
+    with metrics.timer("scan_phase_duration_seconds", phase="discovery"):
+        if len(wantedBacnetDevices) > 0:
+            devicesFound = [describeDevice(ipAddress, deviceId) for ipAddress, deviceId in
+                            discoverDevices(configManager.getDiscoveryTimeout(), wantedBacnetDevices)
+                            if deviceId in wantedBacnetDevices]
+        else:
+            bacnet.whois()
+            devicesFound = bacnet.devices
+    deviceIdsFound = [device[3] for device in devicesFound]
     utilClass.doPrint(f"Devices found: {str(deviceIdsFound)}\n", newline=True)
 
     for deviceId in wantedBacnetDevices:
         if deviceId not in deviceIdsFound:
-            utilClass.doPrint(f"Missing wanted device: {deviceId}")
+            utilClass.doPrint(f"Missing wanted device: {deviceId}", level=logging.WARNING)
 
-    utilClass.doPrint(f"AAS-server: {urlServer}")
+    printTarget(urlServer)
+
+    devicesToBrowse = [device for device in devicesFound
+                       if device[3] in wantedBacnetDevices or len(wantedBacnetDevices) == 0]
+    if shardSettings is not None:
+        browseSharded(devicesToBrowse, urlServer, shardSettings, args)
+    else:
+        browseDevices(devicesToBrowse, urlServer)
 
-    for device in bacnet.devices:
-        deviceName = device[0]
-        ipAddress = device[2]
-        deviceId = device[3]
-        if deviceId not in wantedBacnetDevices and len(wantedBacnetDevices) > 0:
-            continue
 
+def browseDevices(devicesToBrowse, urlServer):
+    workers = configManager.getWorkers()
+    if workers == 1:
+        for device in devicesToBrowse:
+            try:
+                browseDevice(device, urlServer)
+            except Exception as e:
+                utilClass.doPrint(f"Failed to browse device {device[3]}({device[0]}): {e!r}", level=logging.ERROR)
+        return
+
+    utilClass.doPrint(f"Browsing {len(devicesToBrowse)} devices with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(browseDevice, device, urlServer): f"{device[3]}({device[0]})"
+                   for device in devicesToBrowse}
+        waitForDevices(futures)
+
+
+def browseSharded(devicesToBrowse, urlServer, shardSettings, args):
+    """Splits the devices across processes, each browsing its shard with its own BACnet stack. The built devices are
+    sent back and published here."""
+    if journal is not None:
+        for device in list(devicesToBrowse):
+            if journal.isCompleted(device[3]):
+                utilClass.doPrint(f"Device {device[3]}({device[0]}) was completed before the scan was interrupted, skipped")
+                devicesToBrowse.remove(device)
+            else:
+                journal.begin(device[3])
+    if len(devicesToBrowse) == 0:
+        return
+    if propertyCache is not None:
+        # The shards load the cache from the file, e.g. after -invalidatePropertyCache
+        propertyCache.save()
+
+    # Addresses are passed as strings, BACnet addresses cannot be sent to other processes
+    devicesToBrowse = [(device[0], device[1], str(device[2]), device[3]) for device in devicesToBrowse]
+    shards = splitDevices(devicesToBrowse, shardSettings["count"])
+    utilClass.doPrint(f"Browsing {len(devicesToBrowse)} devices in {len(shards)} shards with {configManager.getWorkers()} workers each")
+    interfaces = shardSettings["interfaces"]
+    processes = ShardProcesses(browseShard)
+    for index, devices in enumerate(shards):
+        address = (interfaces[index % len(interfaces)] if len(interfaces) > 0 else None, shardSettings["port"] + index)
+        propertyLists = None
+        if journal is not None:
+            propertyLists = {device[3]: journal.getPropertyLists(device[3]) for device in devices}
+        processes.start(configManager, args, address, devices, urlServer, propertyLists, poller is not None)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            futures = {}
+            for message in processes.iterMessages():
+                if message[0] == "device":
+                    device = message[2]
+                    futures[executor.submit(publishDevice, *device)] = f"{device[0]}({device[1]})"
+                elif message[0] == "propertyLists" and journal is not None:
+                    journal.record(message[2], message[3])
+            waitForDevices(futures)
+        processes.join()
+    finally:
+        processes.terminate()
+
+
+def browseShard(index, messages, shardConfigManager, args, address, devices, urlServer, propertyLists, liveData):
+    """Entry point of a shard process."""
+    global bacnet, configManager, propertyCache, scanRecords, journal, publisher, poller, shard
+    configManager = shardConfigManager
+    setupLogging(**configManager.getLogSettings())
+    shard = ShardContext(index, messages, liveData)
+    try:
+        propertyCacheSettings = configManager.getPropertyCacheSettings()
+        propertyCache = PropertyListCache(**propertyCacheSettings) if propertyCacheSettings is not None else None
+        scanRecordsDirectory = configManager.getScanRecordsDirectory()
+        scanRecords = None
+        if scanRecordsDirectory is not None:
+            scanRecords = ScanRecordStore(scanRecordsDirectory, ignoreExisting="-fullRescan" in args)
+        journal = ShardJournal(shard, propertyLists) if propertyLists is not None else None
+        publisher = None
+        poller = None
+
+        ip, port = address
+        utilClass.doPrint(f"Shard {index} browses {len(devices)} devices from port {port}")
+        bacnet = RequestScheduler(InstrumentedBacnet(BAC0.connect(ip=ip, port=port)),
+                                  **configManager.getRequestLimitSettings())
+        browseDevices(devices, urlServer)
+    except Exception as e:
+        utilClass.doPrint(f"Shard {index} failed: {e!r}", level=logging.ERROR)
+    finally:
+        shard.finish()
+        writeMetrics(f"scanShard{index}")
+        stopLogging()
+
+
+def publishDevice(deviceId, deviceName, aasId, idTypeAas, submodels, urlServer, timestamp, liveDataDevice=None):
+    with metrics.timer("scan_phase_duration_seconds", phase="publish"):
+        published = addAAS(aasId, idTypeAas, deviceName, deviceId, submodels, urlServer, timestamp)
+    if journal is not None and published:
+        journal.complete(deviceId)
+    if poller is not None and liveDataDevice is not None:
+        poller.addDevice(*liveDataDevice)
+
+
+def printTarget(urlServer):
+    if urlServer is None:
+        utilClass.doPrint(f"Export directory: {configManager.getExportSettings()['directory']}")
+    else:
+        utilClass.doPrint(f"AAS-server: {urlServer}")
+
+
+def waitForDevices(futures: dict):
+    for future in as_completed(futures):
+        try:
+            future.result()
+        except Exception as e:
+            utilClass.doPrint(f"Failed to browse device {futures[future]}: {e!r}", level=logging.ERROR)
+
+
+def getWhoisRanges(deviceIds, maxRanges=MAX_WHOIS_RANGES):
+    deviceIds = sorted(set(deviceIds))
+    ranges = [[deviceIds[0], deviceIds[0]]]
+    for deviceId in deviceIds[1:]:
+        if deviceId == ranges[-1][1] + 1:
+            ranges[-1][1] = deviceId
+        else:
+            ranges.append([deviceId, deviceId])
+
+    if len(ranges) <= maxRanges:
+        return [tuple(whoisRange) for whoisRange in ranges]
+
+    # Too many requests otherwise: close the smallest gaps between ranges
+    gaps = sorted(range(len(ranges) - 1), key=lambda i: ranges[i + 1][0] - ranges[i][1])
+    closedGaps = set(gaps[:len(ranges) - maxRanges])
+    merged = []
+    for i, whoisRange in enumerate(ranges):
+        if i - 1 in closedGaps:
+            merged[-1][1] = whoisRange[1]
+        else:
+            merged.append(whoisRange)
+    return [tuple(whoisRange) for whoisRange in merged]
+
+
+def discoverDevices(timeout, wantedBacnetDevices=None):
+    deadline = time.monotonic() + timeout
+    if wantedBacnetDevices:
+        whoisRanges = getWhoisRanges(wantedBacnetDevices)
+        utilClass.doPrint(f"Sending Who-Is for device ranges: {str(whoisRanges)}")
+        for low, high in whoisRanges:
+            threading.Thread(target=bacnet.whois, args=(f"{low} {high}",), daemon=True).start()
+    else:
+        threading.Thread(target=bacnet.whois, daemon=True).start()
+
+    seen = set()
+    missing = set(wantedBacnetDevices or [])
+    while True:
+        for key in list(bacnet.this_application.i_am_counter.keys()):
+            if key not in seen:
+                seen.add(key)
+                missing.discard(key[1])
+                yield key
+        if wantedBacnetDevices and len(missing) == 0:
+            utilClass.doPrint("All wanted devices answered, discovery finished")
+            return
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(DISCOVERY_POLL_INTERVAL)
+
+
+def browseStreaming(wantedBacnetDevices, urlServer):
+    discoveryTimeout = configManager.getDiscoveryTimeout()
+    workers = configManager.getWorkers()
+    utilClass.doPrint(f"Browsing devices as they answer for {discoveryTimeout} s with {workers} workers")
+
+    deviceIdsFound = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        with metrics.timer("scan_phase_duration_seconds", phase="discovery"):
+            for ipAddress, deviceId in discoverDevices(discoveryTimeout, wantedBacnetDevices):
+                deviceIdsFound.append(deviceId)
+                if deviceId not in wantedBacnetDevices and len(wantedBacnetDevices) > 0:
+                    continue
+                utilClass.doPrint(f"Device found: {deviceId}")
+                futures[executor.submit(browseDiscoveredDevice, ipAddress, deviceId, urlServer)] = str(deviceId)
+
+        utilClass.doPrint(f"Discovery finished, devices found: {str(deviceIdsFound)}")
+        for deviceId in wantedBacnetDevices:
+            if deviceId not in deviceIdsFound:
+                utilClass.doPrint(f"Missing wanted device: {deviceId}", level=logging.WARNING)
+        waitForDevices(futures)
+
+
+def describeDevice(ipAddress, deviceId):
+    deviceName = readDeviceProperty(ipAddress, deviceId, "objectName", str(deviceId))
+    return deviceName, None, ipAddress, deviceId
+
+
+def browseDiscoveredDevice(ipAddress, deviceId, urlServer):
+    browseDevice(describeDevice(ipAddress, deviceId), urlServer)
+
+
+def browseDevice(device, urlServer):
+    deviceName = device[0]
+    ipAddress = device[2]
+    deviceId = device[3]
+
+    utilClass.setDeviceContext(f"{deviceId}({deviceName})" if configManager.getWorkers() > 1 else None)
+    try:
+        if journal is not None:
+            if journal.isCompleted(deviceId):
+                utilClass.doPrint(f"Device {deviceId}({deviceName}) was completed before the scan was interrupted, skipped")
+                return
+            journal.begin(deviceId)
         utilClass.doPrint(f"Starting to browse device {deviceId}({deviceName})", newline=True)
-        objectList = bacnet.read(f"{ipAddress} device {deviceId} objectList")
+        servicesSupported = getServicesSupported(ipAddress, deviceId)
+        with metrics.timer("scan_phase_duration_seconds", phase="objectList"):
+            objectList, knownPropertyLists, databaseRevision = getIncrementalScanState(ipAddress, deviceId,
+                                                                                       servicesSupported)
         utilClass.doPrint(f"Found {str(len(objectList))} objects")
+        if journal is not None:
+            journaledPropertyLists = journal.getPropertyLists(deviceId)
+            if len(journaledPropertyLists) > 0:
+                utilClass.doPrint(f"Continuing with the property lists of {len(journaledPropertyLists)} objects from the journal")
+                knownPropertyLists = dict(knownPropertyLists, **journaledPropertyLists)
 
-        aasIdFull = configManager.getIdAAS(deviceName, deviceId)
+        timestamp = SchemeTimestamp()
+        aasIdFull = configManager.getIdAAS(deviceName, deviceId, timestamp)
         aasId = aasIdFull["id"]
         idTypeAas = aasIdFull["idType"]
 
-        servicesSupported = getServicesSupported(ipAddress, deviceId)
-
         submodels = []
 
-        aid, objectPropMap = buildAidSubmodel(ipAddress, objectList, servicesSupported, deviceName, deviceId)
+        with metrics.timer("scan_phase_duration_seconds", phase="propertyLists"):
+            aid, objectPropMap = buildAidSubmodel(ipAddress, objectList, servicesSupported, deviceName, deviceId,
+                                                  knownPropertyLists, timestamp)
         submodels.append(aid)
-        liveData = buildLiveDataSubmodel(objectPropMap, deviceName, deviceId)
+        if scanRecords is not None:
+            scanRecords.put(deviceId, ipAddress, databaseRevision, objectList, objectPropMap)
+        liveData = buildLiveDataSubmodel(objectPropMap, deviceName, deviceId, timestamp)
         submodels.append(liveData)
 
         aimc = buildAIMCSubmodel(
@@ -104,21 +676,31 @@ def main():
             idTypeAID=aid["identification"]["idType"],
             idTypeLiveDataSubmodel=liveData["identification"]["idType"],
             deviceId=deviceId,
-            deviceName=deviceName
+            deviceName=deviceName,
+            timestamp=timestamp
         )
         submodels.append(aimc)
 
-        addAAS(aasId, idTypeAas, deviceName, deviceId, submodels, urlServer)
+        liveDataDevice = None
+        if poller is not None or (shard is not None and shard.liveData):
+            liveDataDevice = (ipAddress, deviceId, deviceName, aasId, liveData, aimc, list(objectList), objectPropMap,
+                              getRpmBatchSize(ipAddress, deviceId, servicesSupported), servicesSupported)
+        if shard is not None:
+            shard.sendDevice(deviceId, deviceName, aasId, idTypeAas, submodels, urlServer, timestamp, liveDataDevice)
+        else:
+            publishDevice(deviceId, deviceName, aasId, idTypeAas, submodels, urlServer, timestamp, liveDataDevice)
+    finally:
+        utilClass.setDeviceContext(None)
 
 
-def buildLiveDataSubmodel(objectPropMap: dict, deviceName, deviceId):
-    idLiveData = configManager.getIdLiveData(deviceName, deviceId)
+def buildLiveDataSubmodel(objectPropMap: dict, deviceName, deviceId, timestamp=None):
+    idLiveData = configManager.getIdLiveData(deviceName, deviceId, timestamp)
     submodelBuilder = SubmodelBuilder(idLiveData["id"], "BACnetDatapointsInformation", idType=idLiveData["idType"])
     submodelBuilder.setSemanticId(configManager.getSemanticIdLiveData())
     submodel = submodelBuilder.build()
 
     for objectIdentifier, propList in objectPropMap.items():
-        if objectIdentifier.isnumeric():
+        if objectIdentifier[0].isdigit():
             objectIdentifier = "proprietary_" + objectIdentifier
         object_smc = SubmodelElementCollectionBuilder(objectIdentifier).build()
         for prop in propList:
@@ -137,7 +719,8 @@ def buildAIMCSubmodel(idAAS: str,
                       deviceId,
                       idTypeAAS: str,
                       idTypeAID: str,
-                      idTypeLiveDataSubmodel):
+                      idTypeLiveDataSubmodel,
+                      timestamp=None):
     relationshipBuilder = RelationshipsBuilder(
         idAAS,
         idAID,
@@ -148,25 +731,177 @@ def buildAIMCSubmodel(idAAS: str,
         idTypeLiveDataSubmodel)
     relations = relationshipBuilder.getElements()
 
-    idAIMC = configManager.getIdAIMC(deviceName, deviceId)
+    idAIMC = configManager.getIdAIMC(deviceName, deviceId, timestamp)
     aimcBuilder = AssetInterfaceMappingConfigurationBuilder(idAIMC["id"], idAAS, idAID, idAIMC["idType"], idTypeAAS, idTypeAID,
-                                                            configManager.getIdShortAIMC(deviceName, deviceId))
+                                                            configManager.getIdShortAIMC(deviceName, deviceId, timestamp))
     semanticIdAimc = configManager.getSemanticIdAIMC()
     aimcBuilder.setSemanticId(semanticIdAimc)
     aimcBuilder.addRelationshipElements(relations)
     return aimcBuilder.build()
 
-def tryAllProperties(ipAddress, object):
+def getProbeCandidates(objectType):
+    if objectType not in requiredPropertiesForType.keys():
+        return COMMON_PROPERTIES
+    if configManager.getPropertyProbing() == "required":
+        return requiredPropertiesForType[objectType]
+    return requiredPropertiesForType[objectType] + optionalPropertiesForType[objectType]
+
+
+def probePropertiesMultiple(ipAddress, object, properties):
+    request = {
+        "address": ipAddress,
+        "objects": {f"{object[0]}:{object[1]}": properties}
+    }
+    try:
+        result = bacnet.readMultiple("", request_dict=request)
+    except BAC0.core.io.IOExceptions.UnrecognizedService:
+        return probePropertiesSingle(ipAddress, object, properties)
+    except (ValueError,
+            BAC0.core.io.IOExceptions.SegmentationNotSupported,
+            BAC0.core.io.IOExceptions.UnknownObjectError):
+        if len(properties) == 1:
+            return []
+        return splitProbedProperties(ipAddress, object, properties)
+
+    if type(result) != dict:
+        # BAC0 returns the same for a timeout as for an abort. The first property is probed alone before splitting:
+        # if the device does not answer that either, NoResponseFromController aborts it.
+        if len(properties) == 1:
+            raise BAC0.core.io.IOExceptions.NoResponseFromController(
+                f"No response to ReadPropertyMultiple from {ipAddress}")
+        return probePropertiesMultiple(ipAddress, object, properties[:1]) + \
+            splitProbedProperties(ipAddress, object, properties[1:])
+
     propertyList = []
-    for propIndex, propName in propertyNameForId.items():
+    for values in result.values():
+        for propertyIdentifier, value in values:
+            if value is not None:
+                propertyList.append(str(propertyIdentifier))
+    return propertyList
+
+
+def splitProbedProperties(ipAddress, object, properties):
+    if len(properties) == 1:
+        return probePropertiesMultiple(ipAddress, object, properties)
+    metrics.inc("bacnet_retries_total", device=ipAddress)
+    middle = len(properties) // 2
+    return probePropertiesMultiple(ipAddress, object, properties[:middle]) + \
+        probePropertiesMultiple(ipAddress, object, properties[middle:])
+
+
+def probePropertiesSingle(ipAddress, object, properties):
+    # Properties are read by their identifier: BAC0's read returns a default value instead of raising
+    # UnknownPropertyError if the request names description, activeText or inactiveText.
+    # NoResponseFromController is passed on, a device that stopped answering is not browsed further.
+    propertyList = []
+    for propName in properties:
         try:
-            bacnet.read(f'{ipAddress} {object[0]} {object[1]} {propIndex}')
+            bacnet.read(f'{ipAddress} {object[0]} {object[1]} {propertyIdForName.get(propName, propName)}')
             propertyList.append(propName)
+        except BAC0.core.io.IOExceptions.NoResponseFromController:
+            raise
         except:
             continue
     return propertyList
 
-def getObjectProperties(ipAddress, object):
+
+def probeObjectProperties(ipAddress, object, useRpm):
+    candidates = getProbeCandidates(str(object[0]))
+    if not useRpm or str(object[0]) not in requiredPropertiesForType.keys():
+        return probePropertiesSingle(ipAddress, object, candidates)
+
+    propertyList = []
+    for start in range(0, len(candidates), PROBE_PROPERTIES_PER_RPM):
+        propertyList += probePropertiesMultiple(ipAddress, object, candidates[start:start + PROBE_PROPERTIES_PER_RPM])
+    return propertyList
+
+def readPropertyLists(ipAddress, objects):
+    request = {
+        "address": ipAddress,
+        "objects": {f"{object[0]}:{object[1]}": ["propertyList"] for object in objects}
+    }
+    try:
+        result = bacnet.readMultiple("", request_dict=request)
+    except BAC0.core.io.IOExceptions.UnrecognizedService:
+        return {}
+    except (ValueError,
+            BAC0.core.io.IOExceptions.SegmentationNotSupported,
+            BAC0.core.io.IOExceptions.UnknownObjectError):
+        if len(objects) == 1:
+            return {}
+        return splitPropertyLists(ipAddress, objects)
+
+    if type(result) != dict:
+        # BAC0 returns the same for a timeout as for an abort. The first object is read alone before splitting: if
+        # the device does not answer that either, NoResponseFromController aborts it.
+        if len(objects) == 1:
+            raise BAC0.core.io.IOExceptions.NoResponseFromController(
+                f"No response to ReadPropertyMultiple from {ipAddress}")
+        propertyLists = readPropertyLists(ipAddress, objects[:1])
+        propertyLists.update(splitPropertyLists(ipAddress, objects[1:]))
+        return propertyLists
+
+    propertyLists = {}
+    for objectIdentifier, values in result.items():
+        for propertyIdentifier, value in values:
+            if propertyIdentifier == "propertyList" and value is not None:
+                propertyLists[getObjectIdentifier(objectIdentifier)] = [str(prop) for prop in value]
+    return propertyLists
+
+
+def splitPropertyLists(ipAddress, objects):
+    if len(objects) == 1:
+        return readPropertyLists(ipAddress, objects)
+    metrics.inc("bacnet_retries_total", device=ipAddress)
+    middle = len(objects) // 2
+    propertyLists = readPropertyLists(ipAddress, objects[:middle])
+    propertyLists.update(readPropertyLists(ipAddress, objects[middle:]))
+    return propertyLists
+
+
+def getObjectIdentifier(object):
+    return str(object[0]) + "_" + str(object[1])
+
+
+def getBatchPropertyLists(ipAddress, batch, useRpm, templates, knownPropertyLists):
+    propertyLists = {}
+    cachedObjects = []
+    objectsToRead = []
+    for object in batch:
+        objectIdentifier = getObjectIdentifier(object)
+        if objectIdentifier in knownPropertyLists.keys():
+            propertyLists[objectIdentifier] = knownPropertyLists[objectIdentifier]
+            continue
+        if templates is not None:
+            cached = templates.plan(object)
+            if cached is not None:
+                propertyLists[objectIdentifier] = cached
+                cachedObjects.append(object)
+                continue
+        objectsToRead.append(object)
+
+    batchedPropertyLists = readPropertyLists(ipAddress, objectsToRead) if useRpm and len(objectsToRead) > 0 else {}
+    for object in objectsToRead:
+        objectIdentifier = getObjectIdentifier(object)
+        propertyList = batchedPropertyLists.get(objectIdentifier)
+        if propertyList is None:
+            if useRpm:
+                metrics.inc("bacnet_retries_total", device=ipAddress)
+            propertyList = getObjectProperties(ipAddress, object, useRpm=useRpm)
+        if templates is not None:
+            templates.record(object, propertyList)
+        propertyLists[objectIdentifier] = propertyList
+
+    for object in cachedObjects:
+        if templates.isRejected(object):
+            propertyList = getObjectProperties(ipAddress, object, useRpm=useRpm)
+            templates.record(object, propertyList)
+            propertyLists[getObjectIdentifier(object)] = propertyList
+
+    return propertyLists
+
+
+def getObjectProperties(ipAddress, object, useRpm=False):
     counter = 0
 
     try:
@@ -182,17 +917,30 @@ def getObjectProperties(ipAddress, object):
                 except:
                     continue
             if len(propertyList) < 2:
-                propertyList = tryAllProperties(ipAddress, object)
+                propertyList = probeObjectProperties(ipAddress, object, useRpm)
         except KeyError as e:
-            propertyList = tryAllProperties(ipAddress, object)
+            propertyList = probeObjectProperties(ipAddress, object, useRpm)
 
     counter += 1
     return propertyList
 
 
-def buildAidSubmodel(ipAddress, objectList, servicesSupported, deviceName, deviceId):
-    idAidSM = configManager.getIdAID(deviceName, deviceId)
-    idShortAid = configManager.getIdShortAID(deviceName, deviceId)
+def iterBatches(objects, batchSize):
+    # Takes the objects as they are read, an ObjectListStream is read chunk by chunk while browsing
+    batch = []
+    for object in objects:
+        batch.append(object)
+        if len(batch) == batchSize:
+            yield batch
+            batch = []
+    if len(batch) > 0:
+        yield batch
+
+
+def buildAidSubmodel(ipAddress, objectList, servicesSupported, deviceName, deviceId, knownPropertyLists=None,
+                     timestamp=None):
+    idAidSM = configManager.getIdAID(deviceName, deviceId, timestamp)
+    idShortAid = configManager.getIdShortAID(deviceName, deviceId, timestamp)
     submodelBuilder = SubmodelBuilder(idAidSM["id"], idShortAid, idType=idAidSM["idType"])
     semanticIdAid = configManager.getSemanticIdAID()
     submodelBuilder.setSemanticId(semanticIdAid)
@@ -207,30 +955,56 @@ def buildAidSubmodel(ipAddress, objectList, servicesSupported, deviceName, devic
     objectPropMap = {}
     object_counter = 0
     nr_objects = len(objectList)
-    for object in objectList:
-        utilClass.doPrint(f"Objects browsed: {str(object_counter)}/{str(nr_objects)}", end="\r")
+    progress = RateLimitedProgress("Objects browsed", nr_objects, inline=configManager.getWorkers() == 1)
 
-        objectIdentifier = str(object[0]) + "_" + str(object[1])
-        if objectIdentifier[0].isdigit():
-            var3 = SubmodelElementCollectionBuilder("proprietary_" + objectIdentifier).build()
-        else:
-            var3 = SubmodelElementCollectionBuilder(objectIdentifier).build()
+    if knownPropertyLists is None:
+        knownPropertyLists = {}
+    useRpm = "readPropertyMultiple" in servicesSupported
+    # The objects of an objectList read while browsing may not all be known, even with more known property lists
+    readsLive = len(knownPropertyLists) < nr_objects or \
+        (isinstance(objectList, ObjectListStream) and not objectList.isComplete())
+    batchSize = 1
+    if readsLive:
+        batchSize = getRpmBatchSize(ipAddress, deviceId, servicesSupported)
+    if batchSize > 1:
+        utilClass.doPrint(f"Reading property lists with ReadPropertyMultiple, {batchSize} objects per request")
+    propertyLists = {}
+
+    templates = None
+    if propertyCache is not None and readsLive:
+        deviceModel = getDeviceModel(ipAddress, deviceId)
+        if deviceModel is not None:
+            templates = propertyCache.forDevice(deviceModel)
+
+    for batch in iterBatches(objectList, batchSize):
+        propertyLists = getBatchPropertyLists(ipAddress, batch, useRpm, templates, knownPropertyLists)
+        for object in batch:
+            objectIdentifier = getObjectIdentifier(object)
+            if objectIdentifier[0].isdigit():
+                var3 = SubmodelElementCollectionBuilder("proprietary_" + objectIdentifier).build()
+            else:
+                var3 = SubmodelElementCollectionBuilder(objectIdentifier).build()
 
-        var3["value"].append(PropertyBuilder(idShort="bacnet:ObjectType", value=object[0]).build())
-        var3["value"].append(PropertyBuilder(idShort="bacnet:InstanceNumber", value=str(object[1])).build())
-        var3["value"].append(PropertyBuilder(idShort="bacnet:service", value=str(servicesSupported)).build())
-        var3["value"].append(SubmodelElementCollectionBuilder(idShort="dataMapping").build())
+            var3["value"].append(PropertyBuilder(idShort="bacnet:ObjectType", value=object[0]).build())
+            var3["value"].append(PropertyBuilder(idShort="bacnet:InstanceNumber", value=str(object[1])).build())
+            var3["value"].append(PropertyBuilder(idShort="bacnet:service", value=str(servicesSupported)).build())
+            var3["value"].append(SubmodelElementCollectionBuilder(idShort="dataMapping").build())
 
-        propertyList = getObjectProperties(ipAddress, object)
-        objectPropMap[objectIdentifier] = propertyList
-        var3["value"].append(PropertyBuilder(idShort="bacnet:PropertyList", value=str(propertyList)).build())
+            propertyList = propertyLists[objectIdentifier]
+            objectPropMap[objectIdentifier] = propertyList
+            var3["value"].append(PropertyBuilder(idShort="bacnet:PropertyList", value=str(propertyList)).build())
 
-        aid_properties["value"].append(var3)
+            aid_properties["value"].append(var3)
 
-        object_counter += 1
+            object_counter += 1
+            progress.update(object_counter)
 
-        if object_counter == nr_objects:
-            utilClass.doPrint(f"Objects browsed: {str(object_counter)}/{str(nr_objects)}", end="\n")
+        if journal is not None:
+            journal.record(deviceId, {objectIdentifier: propertyList for objectIdentifier, propertyList in propertyLists.items()
+                                      if objectIdentifier not in knownPropertyLists.keys()})
+
+    if templates is not None:
+        templates.finish()
 
     interfaceMetadata["value"].append(aid_properties)
     interfaceMetadata["value"].append(operations)
@@ -250,46 +1024,13 @@ def buildAidSubmodel(ipAddress, objectList, servicesSupported, deviceName, devic
     return submodel, objectPropMap
 
 
-def putElement(url, element):
-    tries = 0
-    while tries < 5:
-        try:
-            r = requests.put(url, str(element))
-            if r.status_code != 200:
-                utilClass.doPrint(r.status_code)
-                utilClass.doPrint(r.text)
-                if type(element) == dict:
-                    if "idShort" in element.keys():
-                        utilClass.doPrint(element["idShort"])
-            return r.status_code
-        except:
-            if tries == 5:
-                utilClass.doPrint(
-                    f"Failed to publish element: idShort: '{element['idShort']}', id: '{element['identification']['id']}'")
-                return 400
-
-            tries += 1
-
-
-def addAAS(aasId, idTypeAas, deviceName, deviceId, submodels, urlServer):
+def addAAS(aasId, idTypeAas, deviceName, deviceId, submodels, urlServer, timestamp=None):
     assetId = configManager.getAssetId(deviceName, deviceId)
-    aasShortId = configManager.getIdShortAAS(deviceName, deviceId)
+    aasShortId = configManager.getIdShortAAS(deviceName, deviceId, timestamp)
 
     aas = AssetAdministrationShellBuilder(aasId, aasShortId, assetId, idType=idTypeAas).build()
 
-    response_code = putElement(urlServer + aasId, str(aas))
-    if response_code == 200:
-        utilClass.doPrint(f"Published AAS '{aasId}' for device '{deviceId}({deviceName})'")
-
-
-
-    for submodel in submodels:
-        response_code = putElement(urlServer + aasId + "/aas/submodels/" + submodel["idShort"], str(submodel))
-        if response_code == 200:
-            idShortSM = submodel['idShort']
-            utilClass.doPrint(f"Added Submodel '{idShortSM}' to AAS '{aasId}'")
-
-    return aas
+    return publisher.publishAAS(aasId, aas, submodels, f"{deviceId}({deviceName})")
 
 
 if __name__ == "__main__":
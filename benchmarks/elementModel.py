@@ -0,0 +1,115 @@
+"""Compares the element model of patterns.py with the plain nested dicts it replaced, for an AID submodel of a
+device with many objects.
+
+    python benchmarks/elementModel.py [objects]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from patterns import SubmodelBuilder, SubmodelElementCollectionBuilder, PropertyBuilder
+from serialization import toJson
+
+PROPERTY_LIST = ["presentValue", "statusFlags", "eventState", "outOfService", "units", "description"]
+
+
+def dictProperty(idShort, value=""):
+    return {
+        "semanticId": {"keys": []},
+        "idShort": idShort,
+        "kind": "Instance",
+        "valueType": "string",
+        "qualifiers": [],
+        "modelType": {"name": "Property"},
+        "value": value
+    }
+
+
+def dictCollection(idShort):
+    return {
+        "ordered": False,
+        "parent": {"keys": []},
+        "semanticId": {"keys": []},
+        "idShort": idShort,
+        "kind": "Instance",
+        "qualifiers": [],
+        "modelType": {"name": "SubmodelElementCollection"},
+        "value": [],
+        "allowDuplicates": False
+    }
+
+
+def dictSubmodel(id, idShort):
+    return {
+        "semanticId": {"keys": []},
+        "identification": {"idType": "IRI", "id": id},
+        "idShort": idShort,
+        "kind": "Instance",
+        "dataSpecification": [],
+        "qualifiers": [],
+        "modelType": {"name": "Submodel"},
+        "embeddedDataSpecifications": [],
+        "submodelElements": []
+    }
+
+
+def elementSubmodel(id, idShort):
+    return SubmodelBuilder(id, idShort, idType="IRI").build()
+
+
+def elementCollection(idShort):
+    return SubmodelElementCollectionBuilder(idShort).build()
+
+
+def elementProperty(idShort, value=""):
+    return PropertyBuilder(idShort=idShort, value=value).build()
+
+
+def buildAid(objects, newSubmodel, newCollection, newProperty):
+    # Same structure as buildAidSubmodel in BACnetDiscovery.py
+    submodel = newSubmodel("benchmark", "AssetInterfacesDescription")
+    properties = newCollection("Properties")
+    propertyList = str(PROPERTY_LIST)
+    for instance in range(objects):
+        objectSmc = newCollection(f"analogValue_{instance}")
+        objectSmc["value"].append(newProperty("bacnet:ObjectType", "analogValue"))
+        objectSmc["value"].append(newProperty("bacnet:InstanceNumber", str(instance)))
+        objectSmc["value"].append(newProperty("bacnet:service", "['readProperty', 'readPropertyMultiple']"))
+        objectSmc["value"].append(newCollection("dataMapping"))
+        objectSmc["value"].append(newProperty("bacnet:PropertyList", propertyList))
+        properties["value"].append(objectSmc)
+    submodel["submodelElements"].append(properties)
+    return submodel
+
+
+def measure(name, objects, builders):
+    tracemalloc.start()
+    started = time.perf_counter()
+    submodel = buildAid(objects, *builders)
+    buildTime = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    size = len(toJson(submodel))
+    serializeTime = time.perf_counter() - started
+    print(f"{name:8} build {buildTime * 1000:8.1f} ms  peak {peak / 1024 / 1024:7.1f} MiB  "
+          f"retained {retained / 1024 / 1024:7.1f} MiB  serialize {serializeTime * 1000:8.1f} ms  ({size} bytes)")
+    return toJson(submodel)
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"AID submodel with {objects} objects")
+    dictJson = measure("dict", objects, (dictSubmodel, dictCollection, dictProperty))
+    elementJson = measure("element", objects, (elementSubmodel, elementCollection, elementProperty))
+    if dictJson != elementJson:
+        print("Serialized submodels differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Runs BACnetDiscovery.main() against simulated devices and a local stand-in AAS server and reports its throughput.
+
+    python benchmarks/endToEnd.py [-devices 20] [-objects 500] [-latency 0.005] [-missingPropertyListEvery 0]
+                                  [-json <file>] [further BACnetDiscovery arguments, e.g. -workers 4]
+"""
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from simulation import SimulatedBacnet, FakeAASServer, createDevices
+
+import BAC0
+import BACnetDiscovery
+
+BENCHMARK_OPTIONS = {"-devices": (int, 20), "-objects": (int, 500), "-latency": (float, 0.005),
+                     "-missingPropertyListEvery": (int, 0), "-json": (str, None)}
+
+
+def getArgs(args):
+    options = {}
+    remaining = list(args)
+    for name, (optionType, default) in BENCHMARK_OPTIONS.items():
+        options[name[1:]] = default
+        if name in remaining:
+            index = remaining.index(name)
+            options[name[1:]] = optionType(remaining[index + 1])
+            del remaining[index:index + 2]
+    return options, remaining
+
+
+def writeConfig(directory, serverUrl):
+    config = {"serverUrl": serverUrl}
+    for name in ("schemeIdAas", "schemeIdAid", "schemeIdAimc", "schemeIdLiveData"):
+        config[name] = {"id": f"benchmark-{name}-$deviceId$", "idType": "IRI"}
+    for name in ("semanticIdAid", "semanticIdAimc", "semanticIdLiveData"):
+        config[name] = {"idType": "Custom", "value": f"benchmark/{name}", "local": True}
+    with open(os.path.join(directory, "config.json"), "w") as f:
+        json.dump(config, f)
+
+
+def main():
+    options, discoveryArgs = getArgs(sys.argv[1:])
+    devices = createDevices(options["devices"], options["objects"], options["missingPropertyListEvery"])
+    network = SimulatedBacnet(devices, options["latency"])
+    server = FakeAASServer().start()
+
+    with tempfile.TemporaryDirectory() as configDirectory:
+        writeConfig(configDirectory, server.url)
+        BAC0.connect = lambda *args, **kwargs: network
+        sys.argv = [sys.argv[0], "-pathConfig", configDirectory] + discoveryArgs
+        started = time.perf_counter()
+        BACnetDiscovery.main()
+        elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    report = {
+        "devices": options["devices"],
+        "objectsPerDevice": options["objects"],
+        "latency": options["latency"],
+        "missingPropertyListEvery": options["missingPropertyListEvery"],
+        "arguments": discoveryArgs,
+        "seconds": round(elapsed, 3),
+        "devicesPerMinute": round(options["devices"] / elapsed * 60, 1),
+        "bacnetRequests": dict(network.requests),
+        "httpRequests": dict(server.requests),
+        "httpBytesReceived": server.bytesReceived,
+        "peakMemoryMiB": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+    print()
+    print(f"{report['devices']} devices with {report['objectsPerDevice']} objects, latency {report['latency']} s, "
+          f"arguments {' '.join(discoveryArgs) or '-'}")
+    print(f"  time           {report['seconds']} s ({report['devicesPerMinute']} devices/min)")
+    print(f"  BACnet         " + ", ".join(f"{count} {service}" for service, count in sorted(network.requests.items())))
+    print(f"  HTTP           " + ", ".join(f"{count} {method}" for method, count in sorted(server.requests.items()))
+          + f", {server.bytesReceived / 1024 / 1024:.1f} MiB received")
+    print(f"  peak memory    {report['peakMemoryMiB']} MiB (RSS)")
+
+    if options["json"] is not None:
+        with open(options["json"], "w") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
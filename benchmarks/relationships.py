@@ -0,0 +1,73 @@
+"""Compares the RelationshipsBuilder of patterns.py, whose references share the key chain of the AAS and submodels,
+with building every reference from a deep copy of that chain.
+
+    python benchmarks/relationships.py [objects]
+"""
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from patterns import RelationshipsBuilder
+from serialization import toJson
+
+
+class DeepCopyRelationshipsBuilder(RelationshipsBuilder):
+    # Previous implementation: every reference owns a deep copy of the whole key chain
+    def addElement(self, idShort: str, objectIdentifier: str):
+        first, second = self.buildFirstAndSecond(objectIdentifier)
+        self.elements.append({
+            "idShort": idShort,
+            "modelType": {
+                "name": "RelationshipElement"
+            },
+            "first": first,
+            "second": second
+        })
+
+    def buildFirstAndSecond(self, objectIdentifier):
+        if objectIdentifier[0].isdigit():
+            objectIdentifier = "proprietary_" + objectIdentifier
+        var1 = {"type": "SubmodelElementCollection",
+                "idType": "IdShort",
+                "value": objectIdentifier,
+                "local": True}
+        first = copy.deepcopy({"keys": self.first})
+        second = copy.deepcopy({"keys": self.second})
+        first["keys"].append(var1)
+        second["keys"].append(var1)
+        return first, second
+
+
+def measure(name, builderClass, objectList):
+    tracemalloc.start()
+    started = time.perf_counter()
+    elements = builderClass("aas", "aid", "liveData", objectList).getElements()
+    buildTime = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    serialized = toJson(elements)
+    serializeTime = time.perf_counter() - started
+    print(f"{name:9} build {buildTime * 1000:8.1f} ms  peak {peak / 1024 / 1024:7.1f} MiB  "
+          f"retained {retained / 1024 / 1024:7.1f} MiB  serialize {serializeTime * 1000:8.1f} ms")
+    return serialized
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    objectList = [f"analogValue_{instance}" for instance in range(objects)]
+    print(f"AIMC relationships for {objects} objects")
+    deepCopyJson = measure("deepcopy", DeepCopyRelationshipsBuilder, objectList)
+    sharedJson = measure("shared", RelationshipsBuilder, objectList)
+    if deepCopyJson != sharedJson:
+        print("Serialized relationships differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Simulated BACnet devices behind a BAC0 compatible application object, and a stand-in AAS server, for benchmarks
+that run offline on a single machine."""
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BAC0.core.io.IOExceptions import NoResponseFromController, UnknownObjectError, UnknownPropertyError
+
+from utils import protocolServices, propertyNameForId, requiredPropertiesForType, optionalPropertiesForType
+
+OBJECT_TYPES = ("analogInput", "analogValue", "binaryInput", "binaryValue", "multiStateValue")
+OPTIONAL_PROPERTIES_PER_OBJECT = 3
+NOT_IN_PROPERTY_LIST = ("objectIdentifier", "objectName", "objectType", "propertyList")
+
+
+class SimulatedDevice:
+    def __init__(self, deviceId: int, address: str, objectCount: int, propertyList: bool = True):
+        self.deviceId = deviceId
+        self.address = address
+        self.name = f"SimulatedDevice{deviceId}"
+        self.objects = {}
+
+        objectList = [("device", deviceId)] + [(OBJECT_TYPES[i % len(OBJECT_TYPES)], i) for i in range(objectCount)]
+        self.__addObject(("device", deviceId), propertyList, {
+            "objectName": self.name,
+            "vendorName": "Simulation",
+            "vendorIdentifier": 999,
+            "modelName": "SimulatedController",
+            "firmwareRevision": "1.0",
+            "databaseRevision": 1,
+            "maxApduLengthAccepted": 1476,
+            "segmentationSupported": "segmentedBoth",
+            "protocolServicesSupported": [1] * len(protocolServices),
+            "objectList": objectList
+        })
+        for object in objectList[1:]:
+            self.__addObject(object, propertyList, {"objectName": f"{object[0]}_{object[1]}"})
+
+    def __addObject(self, object, propertyList, values):
+        objectType = object[0]
+        properties = {"objectIdentifier": object, "objectType": objectType}
+        for propertyName in requiredPropertiesForType.get(objectType, []) + \
+                optionalPropertiesForType.get(objectType, [])[:OPTIONAL_PROPERTIES_PER_OBJECT]:
+            properties[propertyName] = 0
+        properties.update(values)
+        if propertyList:
+            properties["propertyList"] = [name for name in properties.keys() if name not in NOT_IN_PROPERTY_LIST]
+        self.objects[object] = properties
+
+    def getValue(self, object, propertyName, arrayIndex=None):
+        properties = self.objects.get((object[0], int(object[1])))
+        if properties is None:
+            raise UnknownObjectError(f"Unknown object {object}")
+        if propertyName.isdigit():
+            propertyName = propertyNameForId[int(propertyName)]
+        if propertyName not in properties.keys():
+            raise UnknownPropertyError(f"Unknown property {propertyName}")
+        value = properties[propertyName]
+        if arrayIndex is not None:
+            return len(value) if arrayIndex == 0 else value[arrayIndex - 1]
+        return value
+
+
+class SimulatedApplication:
+    def __init__(self):
+        self.i_am_counter = defaultdict(int)
+
+
+class SimulatedBacnet:
+    """Answers read, readMultiple and whois like a connected BAC0 lite application, after the given latency."""
+
+    def __init__(self, devices: list, latency: float = 0.0):
+        self.devicesByAddress = {device.address: device for device in devices}
+        self.latency = latency
+        self.this_application = SimulatedApplication()
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+
+    def __request(self, service):
+        with self.lock:
+            self.requests[service] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def __getDevice(self, address):
+        device = self.devicesByAddress.get(address)
+        if device is None:
+            raise NoResponseFromController(f"No device at {address}")
+        return device
+
+    def whois(self, *args, **kwargs):
+        self.__request("whoIs")
+        low, high = 0, 4194303
+        if len(args) > 0 and args[0] is not None and len(args[0].split()) == 2:
+            low, high = [int(limit) for limit in args[0].split()]
+        for device in self.devicesByAddress.values():
+            if low <= device.deviceId <= high:
+                self.this_application.i_am_counter[(device.address, device.deviceId)] += 1
+        return list(self.this_application.i_am_counter.keys())
+
+    @property
+    def devices(self):
+        return [(self.devicesByAddress[address].name, "Simulation", address, deviceId)
+                for address, deviceId in list(self.this_application.i_am_counter.keys())]
+
+    def read(self, args, arr_index=None, **kwargs):
+        self.__request("readProperty")
+        address, objectType, instance, propertyName = args.split()[:4]
+        return self.__getDevice(address).getValue((objectType, instance), propertyName, arr_index)
+
+    def readMultiple(self, args, request_dict=None, show_property_name=False, **kwargs):
+        self.__request("readPropertyMultiple")
+        if request_dict is None:
+            address, objectType, instance = args.split()[:3]
+            device = self.__getDevice(address)
+            properties = device.objects.get((objectType, int(instance)))
+            if properties is None:
+                raise UnknownObjectError(f"Unknown object {objectType}:{instance}")
+            if "propertyList" not in properties.keys():
+                # Devices without propertyList do not support reading 'all' either
+                return [(properties["objectName"], "objectName")]
+            return [(value, name) for name, value in properties.items()]
+
+        device = self.__getDevice(request_dict["address"])
+        result = {}
+        for object, propertyNames in request_dict["objects"].items():
+            objectType, instance = object.split(":")
+            values = result[(objectType, int(instance))] = []
+            for propertyName in propertyNames:
+                arrayIndex = None
+                if "@idx:" in propertyName:
+                    propertyName, arrayIndex = propertyName.split("@idx:")
+                    arrayIndex = int(arrayIndex)
+                try:
+                    values.append((propertyName, device.getValue((objectType, instance), propertyName, arrayIndex)))
+                except (UnknownObjectError, UnknownPropertyError):
+                    values.append((propertyName, None))
+        return result
+
+    def disconnect(self):
+        pass
+
+
+def createDevices(count: int, objectCount: int, missingPropertyListEvery: int = 0, firstDeviceId: int = 1000):
+    devices = []
+    for index in range(count):
+        propertyList = missingPropertyListEvery <= 0 or (index + 1) % missingPropertyListEvery != 0
+        devices.append(SimulatedDevice(firstDeviceId + index, f"127.0.0.1:{47809 + index}", objectCount,
+                                       propertyList=propertyList))
+    return devices
+
+
+class FakeAASHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_PUT(self):
+        body = self.__readBody()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        with self.server.lock:
+            self.server.elements[self.path] = etag
+            self.server.requests["PUT"] += 1
+            self.server.bytesReceived += len(body)
+        self.__respond(200, {"ETag": etag})
+
+    def do_GET(self):
+        with self.server.lock:
+            etag = self.server.elements.get(self.path)
+            self.server.requests["GET"] += 1
+        if etag is None:
+            self.__respond(404)
+        elif self.headers.get("If-None-Match") == etag:
+            self.__respond(304, {"ETag": etag})
+        else:
+            self.__respond(200, {"ETag": etag})
+
+    def __readBody(self):
+        if "Content-Length" in self.headers:
+            return self.rfile.read(int(self.headers["Content-Length"]))
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def __respond(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakeAASServer(ThreadingHTTPServer):
+    """Accepts the shells and submodels of the BaSyx API and keeps only their ETags."""
+    daemon_threads = True
+
+    def __init__(self, port: int = 0):
+        super().__init__(("127.0.0.1", port), FakeAASHandler)
+        self.lock = threading.Lock()
+        self.elements = {}
+        self.requests = defaultdict(int)
+        self.bytesReceived = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/shells/"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
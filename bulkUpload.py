@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from logBackend import setupLogging
+from metrics import metrics
+from utils import utilClass, ConfigManager
+from publisher import AASPublisher, PublishState
+from exporter import INDEX_FILE
+
+UPLOADED_FILE = "uploaded.jsonl"
+PROGRESS_INTERVAL = 100
+
+
+def getArgs(args):
+    pathConfig = None
+    if "-pathConfig" in args:
+        pathConfig = args[args.index("-pathConfig") + 1]
+    configManager = ConfigManager(pathConfig)
+
+    overrideOptionFromArgs(args, "-serverUrl", "serverUrl", configManager)
+    overrideOptionFromArgs(args, "-export", "export", configManager)
+    overrideOptionFromArgs(args, "-uploadWorkers", "uploadWorkers", configManager)
+    overrideOptionFromArgs(args, "-publishConcurrency", "publishConcurrency", configManager)
+    overrideOptionFromArgs(args, "-publishTries", "publishTries", configManager)
+    overrideOptionFromArgs(args, "-httpTimeout", "httpTimeout", configManager)
+    overrideOptionFromArgs(args, "-streamThreshold", "streamThreshold", configManager)
+    overrideOptionFromArgs(args, "-publishState", "publishState", configManager)
+    overrideOptionFromArgs(args, "-metrics", "metrics", configManager)
+    overrideOptionFromArgs(args, "-logLevel", "logLevel", configManager)
+    overrideOptionFromArgs(args, "-logFormat", "logFormat", configManager)
+    overrideOptionFromArgs(args, "-logFile", "logFile", configManager)
+    setupLogging(**configManager.getLogSettings())
+
+    return configManager
+
+
+def overrideOptionFromArgs(args, argName, optionName, configManager):
+    if argName in args:
+        try:
+            configManager.overrideOption(optionName, args[args.index(argName) + 1])
+        except IndexError:
+            utilClass.doPrint(f"No value provided for {argName} and therefor ignored.")
+
+
+def readIndex(directory):
+    entries = []
+    path = os.path.join(directory, INDEX_FILE)
+    with open(path) as f:
+        for lineNumber, line in enumerate(f, 1):
+            if line.strip() == "":
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                utilClass.doPrint(f"Line {lineNumber} of '{path}' is not valid JSON and therefor ignored.")
+    return entries
+
+
+def getUploadKey(entry):
+    return f"{entry['aasId']}|{entry['exported']}"
+
+
+def readUploaded(directory):
+    path = os.path.join(directory, UPLOADED_FILE)
+    if not os.path.isfile(path):
+        return set()
+    uploaded = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                uploaded.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                pass
+    return uploaded
+
+
+def loadJson(directory, path):
+    fullPath = os.path.join(directory, path)
+    with open(fullPath, "rb") as f:
+        return json.load(f), os.path.getsize(fullPath)
+
+
+def loadShell(directory, entry):
+    if entry["format"] == "aasx":
+        packagePath = os.path.join(directory, entry["package"])
+        with zipfile.ZipFile(packagePath) as package:
+            with package.open(entry["spec"]) as spec:
+                environment = json.load(spec)
+        aas = dict(environment["assetAdministrationShells"][0])
+        # Published shells carry no submodel references, the server adds them when the submodels are uploaded
+        aas["submodels"] = []
+        return aas, environment["submodels"], os.path.getsize(packagePath)
+
+    aas, size = loadJson(directory, entry["shell"])
+    submodels = []
+    for submodelEntry in entry["submodels"]:
+        submodel, submodelSize = loadJson(directory, submodelEntry["path"])
+        submodels.append(submodel)
+        size += submodelSize
+    return aas, submodels, size
+
+
+class UploadProgress:
+    def __init__(self, total: int):
+        self.total = total
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def record(self, success: bool, size: int):
+        with self.lock:
+            self.done += 1
+            self.bytes += size
+            if not success:
+                self.failed += 1
+            if self.done % PROGRESS_INTERVAL == 0 and self.done < self.total:
+                self.report()
+
+    def report(self):
+        elapsed = max(time.time() - self.started, 0.001)
+        utilClass.doPrint(f"Uploaded {self.done}/{self.total} shells ({self.failed} failed) in {elapsed:.1f} s: "
+                          f"{self.done / elapsed:.1f} shells/s, {self.bytes / elapsed / 1024 / 1024:.2f} MiB/s",
+                          done=self.done, total=self.total, failed=self.failed, seconds=round(elapsed, 3))
+
+
+def uploadShell(directory, entry, publisher, uploadedLock, useContext):
+    if useContext:
+        utilClass.setDeviceContext(entry["device"])
+    try:
+        with metrics.timer("scan_phase_duration_seconds", phase="load"):
+            aas, submodels, size = loadShell(directory, entry)
+        with metrics.timer("scan_phase_duration_seconds", phase="publish"):
+            success = publisher.publishAAS(entry["aasId"], aas, submodels, entry["device"])
+        if success:
+            with uploadedLock:
+                with open(os.path.join(directory, UPLOADED_FILE), "a") as f:
+                    f.write(json.dumps({"key": getUploadKey(entry), "uploaded": time.time()}) + "\n")
+        return success, size
+    finally:
+        utilClass.setDeviceContext(None)
+
+
+def main():
+    args = sys.argv[1:]
+    configManager = getArgs(args)
+
+    exportSettings = configManager.getExportSettings()
+    if exportSettings is None:
+        utilClass.doPrint("No export directory defined, use -export <dir> or key 'export' in config-file")
+        sys.exit(1)
+    directory = exportSettings["directory"]
+
+    entries = readIndex(directory)
+    if "-reupload" not in args:
+        uploaded = readUploaded(directory)
+        remaining = [entry for entry in entries if getUploadKey(entry) not in uploaded]
+        if len(remaining) < len(entries):
+            utilClass.doPrint(f"Skipping {len(entries) - len(remaining)} shells uploaded by a previous run")
+        entries = remaining
+
+    urlServer = configManager.getServerUrl()
+    utilClass.doPrint(f"AAS-server: {urlServer}")
+
+    publishState = None
+    publishStateSettings = configManager.getPublishStateSettings()
+    if publishStateSettings is not None:
+        publishState = PublishState(**publishStateSettings)
+
+    workers = configManager.getUploadWorkers()
+    concurrency = configManager.getPublishConcurrency()
+    publisher = AASPublisher(urlServer, concurrency, configManager.getHttpTimeout(), configManager.getPublishTries(),
+                             streamThreshold=configManager.getStreamThreshold(), publishState=publishState,
+                             connections=workers + concurrency)
+
+    utilClass.doPrint(f"Uploading {len(entries)} shells from '{directory}' with {workers} workers")
+    progress = UploadProgress(len(entries))
+    uploadedLock = threading.Lock()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(uploadShell, directory, entry, publisher, uploadedLock, workers > 1): entry
+                       for entry in entries}
+            for future in as_completed(futures):
+                try:
+                    success, size = future.result()
+                except Exception as e:
+                    utilClass.doPrint(f"Failed to upload AAS '{futures[future]['aasId']}': {e!r}", level=logging.ERROR)
+                    success, size = False, 0
+                progress.record(success, size)
+    finally:
+        publisher.close()
+        progress.report()
+        metricsDirectory = configManager.getMetricsDirectory()
+        if metricsDirectory is not None:
+            metrics.write(metricsDirectory, "bulkUpload")
+            utilClass.doPrint(f"Metrics written to '{metricsDirectory}'")
+
+    if progress.failed > 0:
+        utilClass.doPrint(f"{progress.failed} shells could not be uploaded, run again to retry them", level=logging.ERROR)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
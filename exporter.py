@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zipfile
+
+from serialization import toJson, iterJson, isLarge
+from utils import utilClass
+
+INDEX_FILE = "index.jsonl"
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+AASX_ORIGIN_RELATIONSHIP = "http://www.admin-shell.io/aasx/relationships/aasx-origin"
+AASX_SPEC_RELATIONSHIP = "http://www.admin-shell.io/aasx/relationships/aas-spec"
+
+
+def getSafeName(id: str):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", id)[:150]
+
+
+def getSubmodelReference(submodel):
+    return {
+        "keys": [
+            {
+                "type": "Submodel",
+                "local": True,
+                "value": submodel["identification"]["id"],
+                "idType": submodel["identification"]["idType"]
+            }
+        ]
+    }
+
+
+class AASExporter:
+    def __init__(self, directory: str, exportFormat: str = "json", streamThreshold: int = 10000):
+        self.directory = directory
+        self.exportFormat = exportFormat
+        self.streamThreshold = streamThreshold
+        self.indexLock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def publishAAS(self, aasId, aas, submodels: list, deviceLabel: str):
+        name = getSafeName(aasId)
+        try:
+            if self.exportFormat == "aasx":
+                entry = self.__writeAasx(name, aas, submodels)
+            else:
+                entry = self.__writeJson(name, aas, submodels)
+        except OSError as e:
+            utilClass.doPrint(f"Failed to export AAS '{aasId}' for device '{deviceLabel}': {e}", level=logging.ERROR)
+            return False
+
+        entry.update({"aasId": aasId, "device": deviceLabel, "format": self.exportFormat, "exported": time.time()})
+        with self.indexLock:
+            with open(os.path.join(self.directory, INDEX_FILE), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        utilClass.doPrint(f"Exported AAS '{aasId}' for device '{deviceLabel}'")
+        return True
+
+    def __writeElement(self, f, element, stream=None):
+        if stream is None:
+            stream = isLarge(element, self.streamThreshold)
+        if stream:
+            for chunk in iterJson(element):
+                f.write(chunk)
+        else:
+            f.write(toJson(element))
+
+    def __writeJson(self, name, aas, submodels):
+        os.makedirs(os.path.join(self.directory, name, "submodels"), exist_ok=True)
+        shellPath = f"{name}/shell.json"
+        with open(os.path.join(self.directory, shellPath), "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            self.__writeElement(f, aas)
+
+        submodelEntries = []
+        for submodel in submodels:
+            submodelPath = f"{name}/submodels/{getSafeName(submodel['idShort'])}.json"
+            with open(os.path.join(self.directory, submodelPath), "wb", buffering=WRITE_BUFFER_SIZE) as f:
+                self.__writeElement(f, submodel)
+            submodelEntries.append({"idShort": submodel["idShort"], "path": submodelPath})
+        return {"shell": shellPath, "submodels": submodelEntries}
+
+    def __writeAasx(self, name, aas, submodels):
+        packagePath = name + ".aasx"
+        specPath = f"aasx/{name}/{name}.aas.json"
+
+        shell = dict(aas)
+        shell["submodels"] = [getSubmodelReference(submodel) for submodel in submodels]
+        environment = {
+            "assetAdministrationShells": [shell],
+            "assets": [aas["asset"]],
+            "submodels": submodels,
+            "conceptDescriptions": []
+        }
+
+        with open(os.path.join(self.directory, packagePath), "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as package:
+                package.writestr("[Content_Types].xml",
+                                 '<?xml version="1.0" encoding="utf-8"?>'
+                                 '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                                 '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml" />'
+                                 '<Default Extension="json" ContentType="application/json" />'
+                                 '<Override PartName="/aasx/aasx-origin" ContentType="text/plain" />'
+                                 '</Types>')
+                package.writestr("_rels/.rels", self.__getRelationships(AASX_ORIGIN_RELATIONSHIP, "/aasx/aasx-origin"))
+                package.writestr("aasx/aasx-origin", "Intentionally empty.")
+                package.writestr("aasx/_rels/aasx-origin.rels",
+                                 self.__getRelationships(AASX_SPEC_RELATIONSHIP, "/" + specPath))
+                with package.open(specPath, "w", force_zip64=True) as spec:
+                    self.__writeElement(spec, environment,
+                                        any(isLarge(submodel, self.streamThreshold) for submodel in submodels))
+
+        return {"package": packagePath, "spec": specPath,
+                "submodels": [{"idShort": submodel["idShort"]} for submodel in submodels]}
+
+    @staticmethod
+    def __getRelationships(relationshipType, target):
+        return ('<?xml version="1.0" encoding="utf-8"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                f'<Relationship Type="{relationshipType}" Target="{target}" Id="R1" />'
+                '</Relationships>')
+
+    def close(self):
+        utilClass.doPrint(f"Exported shells are listed in '{os.path.join(self.directory, INDEX_FILE)}'")
@@ -0,0 +1,396 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from BAC0.core.io.IOExceptions import NoResponseFromController, SegmentationNotSupported, UnknownObjectError, \
+    UnrecognizedService
+
+from bacpypes.pdu import Address
+
+from metrics import metrics
+from utils import utilClass
+
+SUMMARY_PERIOD = 60.0
+MAX_WAIT = 1.0
+# Notifications arriving within this period are set on the AAS server together, only the last value per element
+COV_FLUSH_PERIOD = 1.0
+# Subscriptions are renewed after this part of their lifetime
+COV_RENEW_AFTER = 0.8
+# Devices confirm a subscription with a first notification; devices that do not are polled instead
+COV_FIRST_NOTIFICATION_TIMEOUT = 10.0
+# A device that does not answer is polled again after this many seconds, doubled while it stays unreachable
+UNREACHABLE_BACKOFF = 30.0
+MAX_UNREACHABLE_BACKOFF = 600.0
+
+
+def getLiveDataIdShort(object):
+    objectIdentifier = str(object[0]) + "_" + str(object[1])
+    if objectIdentifier[0].isdigit():
+        return "proprietary_" + objectIdentifier
+    return objectIdentifier
+
+
+def findCollection(elements, idShort):
+    for element in elements:
+        if element["idShort"] == idShort:
+            return element
+        if "value" in element.keys() and type(element["value"]) == list:
+            found = findCollection(element["value"], idShort)
+            if found is not None:
+                return found
+    return None
+
+
+def getMappedIdShorts(aimc):
+    """Returns the idShorts of the collections in the live data submodel that the AIMC maps BACnet objects to."""
+    mappings = findCollection(aimc["submodelElements"], "Mappings")
+    if mappings is None:
+        return []
+    return [relationship["second"]["keys"][-1]["value"] for relationship in mappings["value"]]
+
+
+class PolledDevice:
+    __slots__ = ("ipAddress", "deviceId", "label", "urlLiveData", "batchSize", "useRpm", "backoff", "unreachableUntil")
+
+    def __init__(self, ipAddress, deviceId, label, urlLiveData, batchSize, useRpm):
+        self.ipAddress = ipAddress
+        self.deviceId = deviceId
+        self.label = label
+        self.urlLiveData = urlLiveData
+        self.batchSize = batchSize
+        self.useRpm = useRpm
+        self.backoff = 0.0
+        self.unreachableUntil = 0.0
+
+
+class PollGroup:
+    """Objects of one device that are polled with the same interval."""
+    __slots__ = ("device", "interval", "objects", "nextDue", "running")
+
+    def __init__(self, device: PolledDevice, interval: float):
+        self.device = device
+        self.interval = interval
+        self.objects = []
+        self.nextDue = time.monotonic()
+        self.running = False
+
+
+class CovSubscription:
+    """Objects of one device that are updated by COV notifications."""
+    __slots__ = ("device", "mappedObjects", "objects", "contexts", "subscribedAt", "renewDue", "notified")
+
+    def __init__(self, device: PolledDevice, mappedObjects: list):
+        self.device = device
+        self.mappedObjects = mappedObjects
+        self.objects = {(str(object[0]), int(object[1])): (idShort, properties)
+                        for object, idShort, properties in mappedObjects}
+        # BAC0 subscription context per object, renewals and the cancellation use its subscriberProcessIdentifier
+        self.contexts = {}
+        self.subscribedAt = None
+        self.renewDue = time.monotonic()
+        self.notified = False
+
+
+class LiveDataPoller:
+    """Reads the mapped properties of the objects of browsed devices periodically, with ReadPropertyMultiple where
+    the device supports it, and sets the values in the live data submodel that changed since the last read. With cov,
+    devices that support SubscribeCOV send their changes themselves and are only polled if they do not."""
+
+    def __init__(self, bacnet, publisher, properties: list, interval: float, intervals: dict = None, workers: int = 1,
+                 cov: bool = False, covLifetime: int = 300):
+        self.bacnet = bacnet
+        self.publisher = publisher
+        self.properties = properties
+        self.interval = interval
+        self.intervals = intervals or {}
+        self.workers = workers
+        self.cov = cov and hasattr(bacnet, "_build_cov_context")
+        self.covLifetime = covLifetime
+        self.groups = []
+        self.subscriptions = []
+        self.pendingLock = threading.Lock()
+        self.pending = {}
+        self.lastValues = {}
+        self.stopped = threading.Event()
+        self.countLock = threading.Lock()
+        self.counts = {"read": 0, "changed": 0}
+
+    def getInterval(self, object):
+        objectIdentifier = str(object[0]) + "_" + str(object[1])
+        if objectIdentifier in self.intervals.keys():
+            return self.intervals[objectIdentifier]
+        return self.intervals.get(str(object[0]), self.interval)
+
+    def addDevice(self, ipAddress, deviceId, deviceName, aasId, liveData, aimc, objectList, objectPropMap: dict,
+                  batchSize: int, servicesSupported: list):
+        objects = {getLiveDataIdShort(object): object for object in objectList}
+        urlLiveData = f"{self.publisher.urlServer}{aasId}/aas/submodels/{liveData['idShort']}/submodel/submodelElements/"
+        device = PolledDevice(ipAddress, deviceId, f"{deviceId}({deviceName})", urlLiveData, batchSize,
+                              "readPropertyMultiple" in servicesSupported)
+
+        mappedObjects = []
+        for idShort in getMappedIdShorts(aimc):
+            object = objects.get(idShort)
+            if object is None:
+                continue
+            propertyList = objectPropMap.get(str(object[0]) + "_" + str(object[1]), [])
+            properties = [prop for prop in self.properties if prop in propertyList]
+            if len(properties) > 0:
+                mappedObjects.append((object, idShort, properties))
+
+        if self.cov and "subscribeCov" in servicesSupported:
+            self.subscriptions.append(CovSubscription(device, mappedObjects))
+            utilClass.doPrint(f"Subscribing to COV of {len(mappedObjects)} objects of device {device.label}")
+        else:
+            self.__addPollGroups(device, mappedObjects)
+
+    def __addPollGroups(self, device, mappedObjects):
+        groups = {}
+        for object, idShort, properties in mappedObjects:
+            interval = self.getInterval(object)
+            if interval not in groups.keys():
+                groups[interval] = PollGroup(device, interval)
+            groups[interval].objects.append((object, idShort, properties))
+
+        self.groups.extend(groups.values())
+        utilClass.doPrint(f"Polling {len(mappedObjects)} objects of device {device.label} with intervals of "
+                          f"{', '.join(f'{interval:g}' for interval in sorted(groups.keys())) or '-'} s")
+
+    def run(self, duration: float = None):
+        """Polls until stop is called or the duration in seconds has passed."""
+        if len(self.groups) == 0 and len(self.subscriptions) == 0:
+            utilClass.doPrint("No objects to poll", level=logging.WARNING)
+            return
+        deadline = None if duration is None else time.monotonic() + duration
+        nextSummary = time.monotonic() + SUMMARY_PERIOD
+        nextFlush = time.monotonic() + COV_FLUSH_PERIOD
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while not self.stopped.is_set():
+                    now = time.monotonic()
+                    if deadline is not None and now >= deadline:
+                        break
+                    self.__updateSubscriptions(now)
+                    if now >= nextFlush:
+                        self.__flushNotifications()
+                        nextFlush = now + COV_FLUSH_PERIOD
+                    for group in self.groups:
+                        if group.nextDue > now:
+                            continue
+                        if group.device.unreachableUntil > now:
+                            group.nextDue = group.device.unreachableUntil
+                            continue
+                        # A group whose last poll is still running skips this cycle
+                        group.nextDue += group.interval
+                        if group.nextDue <= now:
+                            group.nextDue = now + group.interval
+                        if not group.running:
+                            group.running = True
+                            executor.submit(self.__poll, group)
+                    if now >= nextSummary:
+                        self.__printSummary(SUMMARY_PERIOD)
+                        nextSummary += SUMMARY_PERIOD
+                    wait = min([group.nextDue for group in self.groups] + [nextFlush]) - now
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                    self.stopped.wait(min(max(wait, 0), MAX_WAIT))
+            finally:
+                # Stops the running polls after their current request
+                self.stopped.set()
+                self.__cancelSubscriptions()
+                self.__flushNotifications()
+        self.__printSummary()
+
+    def stop(self):
+        self.stopped.set()
+
+    def __updateSubscriptions(self, now):
+        for subscription in list(self.subscriptions):
+            if not subscription.notified and subscription.subscribedAt is not None \
+                    and now - subscription.subscribedAt >= COV_FIRST_NOTIFICATION_TIMEOUT:
+                utilClass.doPrint(f"No COV notification from device {subscription.device.label}, polling it instead",
+                                  level=logging.WARNING)
+                self.subscriptions.remove(subscription)
+                self.__cancelSubscription(subscription)
+                self.__addPollGroups(subscription.device, subscription.mappedObjects)
+                continue
+            if subscription.renewDue <= now:
+                self.__subscribe(subscription, now)
+
+    def __subscribe(self, subscription: CovSubscription, now):
+        # BAC0's cov() creates a new context with a new subscriberProcessIdentifier on every call, which would add a
+        # subscription on the device with every renewal. The context of an object is built once and sent again instead.
+        callback = partial(self.__onNotification, subscription)
+        for object, idShort, properties in subscription.mappedObjects:
+            objectIdentifier = (str(object[0]), int(object[1]))
+            try:
+                context = subscription.contexts.get(objectIdentifier)
+                if context is None:
+                    context = self.bacnet._build_cov_context(Address(subscription.device.ipAddress), objectIdentifier,
+                                                             confirmed=False, lifetime=self.covLifetime,
+                                                             callback=callback)
+                    subscription.contexts[objectIdentifier] = context
+                self.bacnet.send_cov_subscription(self.bacnet._build_cov_request(context))
+            except Exception as e:
+                utilClass.doPrint(f"COV subscription of {idShort} of device {subscription.device.label} failed: {e!r}",
+                                  level=logging.WARNING)
+        if subscription.subscribedAt is None:
+            subscription.subscribedAt = now
+        subscription.renewDue = now + self.covLifetime * COV_RENEW_AFTER
+
+    def __cancelSubscriptions(self):
+        for subscription in self.subscriptions:
+            self.__cancelSubscription(subscription)
+
+    def __cancelSubscription(self, subscription: CovSubscription):
+        # A SubscribeCOV request without confirmed and lifetime cancels the subscription of its process identifier
+        for context in subscription.contexts.values():
+            context.issueConfirmedNotifications = None
+            context.lifetime = None
+            try:
+                self.bacnet.send_cov_subscription(self.bacnet._build_cov_request(context))
+            except Exception:
+                pass
+            self.bacnet.subscription_contexts.pop(context.subscriberProcessIdentifier, None)
+        subscription.contexts = {}
+
+    def __onNotification(self, subscription: CovSubscription, elements):
+        # Called by the BACnet stack, only collects the values until the next flush
+        subscription.notified = True
+        object = elements["object_changed"]
+        entry = subscription.objects.get((str(object[0]), int(object[1])))
+        if entry is None:
+            return
+        idShort, properties = entry
+        metrics.inc("live_data_notifications_total", device=subscription.device.ipAddress)
+        with self.pendingLock:
+            for propertyIdentifier, value in elements["properties"].items():
+                if str(propertyIdentifier) in properties and value is not None:
+                    self.pending[f"{subscription.device.urlLiveData}{idShort}/{propertyIdentifier}/value"] = str(value)
+
+    def __flushNotifications(self):
+        with self.pendingLock:
+            values = self.pending
+            self.pending = {}
+        if len(values) > 0:
+            self.__setChangedValues(values)
+
+    def __poll(self, group: PollGroup):
+        device = group.device
+        utilClass.setDeviceContext(device.label if self.workers > 1 else None)
+        try:
+            with metrics.timer("live_data_poll_duration_seconds", device=device.ipAddress):
+                for start in range(0, len(group.objects), device.batchSize):
+                    if self.stopped.is_set():
+                        return
+                    batch = group.objects[start:start + device.batchSize]
+                    if device.useRpm:
+                        values = self.__readMultiple(device.ipAddress, batch)
+                    else:
+                        values = self.__readSingle(device.ipAddress, batch)
+                    self.__pushChanges(device, batch, values)
+            if device.backoff > 0:
+                utilClass.doPrint(f"Device {device.label} answers again")
+                device.backoff = 0.0
+        except NoResponseFromController:
+            # The remaining objects are not read in this cycle, they would only time out as well. Another poll group
+            # of the device may have backed off already.
+            now = time.monotonic()
+            if device.unreachableUntil <= now:
+                device.backoff = min(MAX_UNREACHABLE_BACKOFF, max(UNREACHABLE_BACKOFF, device.backoff * 2))
+                device.unreachableUntil = now + device.backoff
+                utilClass.doPrint(f"Device {device.label} does not answer, polling it again in {device.backoff:g} s",
+                                  level=logging.WARNING)
+        except Exception as e:
+            utilClass.doPrint(f"Failed to poll device {device.label}: {e!r}", level=logging.ERROR)
+        finally:
+            group.running = False
+            utilClass.setDeviceContext(None)
+
+    def __readMultiple(self, ipAddress, batch):
+        request = {
+            "address": ipAddress,
+            "objects": {f"{object[0]}:{object[1]}": properties for object, idShort, properties in batch}
+        }
+        try:
+            result = self.bacnet.readMultiple("", request_dict=request)
+        except UnrecognizedService:
+            return self.__readSingle(ipAddress, batch)
+        except (ValueError, SegmentationNotSupported, UnknownObjectError):
+            if len(batch) == 1:
+                return {}
+            return self.__splitBatch(ipAddress, batch)
+
+        if type(result) != dict:
+            # BAC0 returns the same for a timeout as for an abort, e.g. of a too long response. Splitting only helps
+            # against the abort, so the first object is read alone before: if that fails too, the device is taken as
+            # unreachable and NoResponseFromController ends the cycle
+            if len(batch) == 1:
+                raise NoResponseFromController(f"No response to ReadPropertyMultiple from {ipAddress}")
+            values = self.__readMultiple(ipAddress, batch[:1])
+            if len(batch) > 2:
+                values.update(self.__splitBatch(ipAddress, batch[1:]))
+            else:
+                values.update(self.__readMultiple(ipAddress, batch[1:]))
+            return values
+
+        values = {}
+        for (objectType, instance), propertyValues in result.items():
+            for propertyIdentifier, value in propertyValues:
+                if value is not None:
+                    values[(str(objectType), int(instance), str(propertyIdentifier))] = value
+        return values
+
+    def __splitBatch(self, ipAddress, batch):
+        metrics.inc("bacnet_retries_total", device=ipAddress)
+        middle = len(batch) // 2
+        values = self.__readMultiple(ipAddress, batch[:middle])
+        values.update(self.__readMultiple(ipAddress, batch[middle:]))
+        return values
+
+    def __readSingle(self, ipAddress, batch):
+        values = {}
+        for object, idShort, properties in batch:
+            for prop in properties:
+                try:
+                    values[(str(object[0]), int(object[1]), prop)] = \
+                        self.bacnet.read(f"{ipAddress} {object[0]} {object[1]} {prop}")
+                except NoResponseFromController:
+                    raise
+                except Exception:
+                    continue
+        return values
+
+    def __pushChanges(self, device, batch, values):
+        urlValues = {}
+        for object, idShort, properties in batch:
+            for prop in properties:
+                value = values.get((str(object[0]), int(object[1]), prop))
+                if value is not None:
+                    urlValues[f"{device.urlLiveData}{idShort}/{prop}/value"] = str(value)
+        self.__setChangedValues(urlValues)
+
+    def __setChangedValues(self, values: dict):
+        read = len(values)
+        changedValues = {url: value for url, value in values.items() if self.lastValues.get(url) != value}
+        setUrls = self.publisher.putValues(changedValues) if len(changedValues) > 0 else []
+        for url in setUrls:
+            self.lastValues[url] = changedValues[url]
+        changed = len(setUrls)
+        failed = len(changedValues) - changed
+        metrics.inc("live_data_values_total", read - changed - failed, result="unchanged")
+        metrics.inc("live_data_values_total", changed, result="changed")
+        metrics.inc("live_data_values_total", failed, result="failed")
+        with self.countLock:
+            self.counts["read"] += read
+            self.counts["changed"] += changed
+
+    def __printSummary(self, period: float = None):
+        with self.countLock:
+            read, changed = self.counts["read"], self.counts["changed"]
+            self.counts = {"read": 0, "changed": 0}
+        since = f" in the last {period:g} s" if period is not None else ""
+        utilClass.doPrint(f"Live data: {read} values received, {changed} changed and set{since}", read=read,
+                          changed=changed)
@@ -0,0 +1,143 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "BACnetAASCreator"
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+PROGRESS_PERIOD = 1.0
+
+logger = logging.getLogger(LOGGER_NAME)
+logger.propagate = False
+
+_context = threading.local()
+_setupLock = threading.Lock()
+_listener = None
+_queueHandler = None
+
+
+def setDeviceContext(label):
+    _context.label = label
+
+
+def getDeviceContext():
+    return getattr(_context, "label", None)
+
+
+class DeviceContextFilter(logging.Filter):
+    # Runs in the thread that logs, before the record is handed to the background thread
+    def filter(self, record):
+        if not hasattr(record, "device"):
+            record.device = getDeviceContext()
+        return True
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s - %(levelname)-8s| %(devicePrefix)s%(message)s")
+
+    def formatMessage(self, record):
+        record.devicePrefix = f"[{record.device}] " if record.device is not None else ""
+        message = super().formatMessage(record)
+        if getattr(record, "newline", False):
+            message = "\n" + message
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "device": record.device,
+            "message": record.getMessage().strip()
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    # Inline progress lines end with "\r" instead of a newline, so they are overwritten by the next line
+    def __init__(self, stream, inline: bool):
+        super().__init__(stream)
+        self.inline = inline
+
+    def emit(self, record):
+        self.terminator = getattr(record, "end", "\n") if self.inline else "\n"
+        super().emit(record)
+
+
+def setupLogging(level: str = "INFO", logFormat: str = "text", path: str = None):
+    """Replaces the current handlers. Records are only put into a queue by the logging thread, a background thread
+    formats and writes them to the console and, if a path is given, as JSON lines to that file."""
+    with _setupLock:
+        stopLogging()
+        _startLogging(level, logFormat, path)
+
+
+def _startLogging(level="INFO", logFormat="text", path=None):
+    global _listener, _queueHandler
+    console = ConsoleHandler(sys.stdout, inline=logFormat != "json")
+    console.setFormatter(JsonLinesFormatter() if logFormat == "json" else ConsoleFormatter())
+    handlers = [console]
+    if path is not None:
+        jsonFile = logging.FileHandler(path, encoding="utf-8")
+        jsonFile.setFormatter(JsonLinesFormatter())
+        handlers.append(jsonFile)
+
+    records = queue.SimpleQueue()
+    _queueHandler = QueueHandler(records)
+    _queueHandler.addFilter(DeviceContextFilter())
+    logger.addHandler(_queueHandler)
+    logger.setLevel(level)
+    _listener = QueueListener(records, *handlers)
+    _listener.start()
+
+
+def stopLogging():
+    global _listener, _queueHandler
+    if _listener is not None:
+        logger.removeHandler(_queueHandler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queueHandler = None
+
+
+atexit.register(stopLogging)
+
+
+def log(message, level=logging.INFO, end="\n", newline=False, **fields):
+    if _listener is None:
+        # Messages logged before setupLogging is called go to the console with the defaults
+        with _setupLock:
+            if _listener is None:
+                _startLogging()
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"end": end, "newline": newline, "fields": fields})
+
+
+class RateLimitedProgress:
+    """Logs the progress of a loop at most once per period, and always for the last step."""
+
+    def __init__(self, description: str, total: int, inline: bool = False, period: float = PROGRESS_PERIOD):
+        self.description = description
+        self.total = total
+        self.inline = inline
+        self.period = period
+        self.lastReport = None
+
+    def update(self, done: int):
+        now = time.monotonic()
+        if done < self.total and self.lastReport is not None and now - self.lastReport < self.period:
+            return
+        self.lastReport = now
+        end = "\r" if self.inline and done < self.total else "\n"
+        log(f"{self.description}: {done}/{self.total}", end=end, progress=self.description, done=done,
+            total=self.total)
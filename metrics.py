@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+METRIC_HELP = {
+    "bacnet_requests_total": "BACnet requests by device address, service and result (ok, error, timeout)",
+    "bacnet_request_duration_seconds": "Duration of BACnet requests by device address and service",
+    "bacnet_retries_total": "BACnet requests repeated with fewer objects or properties after a failed request",
+    "bacnet_queue_wait_seconds": "Time BACnet requests waited for a free slot of their network",
+    "bacnet_limit_decreases_total": "Halvings of the outstanding request limit of a network after a timeout",
+    "http_requests_total": "Requests to the AAS server by method and status code (error for connection errors)",
+    "http_request_duration_seconds": "Duration of requests to the AAS server by method",
+    "http_retries_total": "Requests to the AAS server repeated after a connection error",
+    "publish_skipped_total": "Shells and submodels not uploaded because they did not change",
+    "live_data_values_total": "Polled live data values by result (changed and set, unchanged, failed to set)",
+    "live_data_notifications_total": "COV notifications received by device address",
+    "live_data_poll_duration_seconds": "Duration of polling the objects of a device with the same interval",
+    "scan_phase_duration_seconds": "Duration of the phases of a scan or upload"
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulativeCounts(self):
+        cumulative = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+
+    @staticmethod
+    def __getKey(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self.__getKey(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value: float, **labels):
+        key = self.__getKey(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def toPrometheus(self):
+        lines = []
+        with self.lock:
+            for name in sorted(set(key[0] for key in self.counters.keys())):
+                self.__addHeader(lines, name, "counter")
+                for (metricName, labels), value in sorted(self.counters.items()):
+                    if metricName == name:
+                        lines.append(f"{name}{self.__formatLabels(labels)} {value}")
+
+            for name in sorted(set(key[0] for key in self.histograms.keys())):
+                self.__addHeader(lines, name, "histogram")
+                for (metricName, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metricName != name:
+                        continue
+                    for bound, count in zip(histogram.buckets, histogram.cumulativeCounts()):
+                        lines.append(f"{name}_bucket{self.__formatLabels(labels + (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{self.__formatLabels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{self.__formatLabels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{self.__formatLabels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def __addHeader(lines, name, metricType):
+        if name in METRIC_HELP.keys():
+            lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+        lines.append(f"# TYPE {name} {metricType}")
+
+    @staticmethod
+    def __formatLabels(labels):
+        if len(labels) == 0:
+            return ""
+        escaped = [(key, value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+                   for key, value in labels]
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def toSummary(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "duration": time.time() - self.started,
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "histograms": [{"name": name, "labels": dict(labels), "count": histogram.count,
+                                "sum": histogram.sum, "mean": histogram.sum / histogram.count,
+                                "max": histogram.max,
+                                "buckets": dict(zip([str(bound) for bound in histogram.buckets],
+                                                    histogram.cumulativeCounts()))}
+                               for (name, labels), histogram in sorted(self.histograms.items(),
+                                                                       key=lambda item: item[0])]
+            }
+
+    def write(self, directory, name):
+        """Writes <name>.prom for the textfile collector of the Prometheus node exporter and <name>.json."""
+        os.makedirs(directory, exist_ok=True)
+        self.__writeAtomic(os.path.join(directory, name + ".prom"), self.toPrometheus())
+        self.__writeAtomic(os.path.join(directory, name + ".json"), json.dumps(self.toSummary(), indent=1))
+
+    @staticmethod
+    def __writeAtomic(path, content):
+        tmpPath = path + ".tmp"
+        with open(tmpPath, "w") as f:
+            f.write(content)
+        os.replace(tmpPath, path)
+
+
+metrics = MetricsRegistry()
+
+
+class InstrumentedBacnet:
+    """Proxy of a BAC0 application that counts and times read, readMultiple and whois per device address."""
+
+    def __init__(self, bacnet, registry: MetricsRegistry = metrics):
+        self.bacnet = bacnet
+        self.registry = registry
+
+    def read(self, args, *otherArgs, **kwargs):
+        return self.__request("readProperty", args.split(" ")[0], self.bacnet.read, args, *otherArgs, **kwargs)
+
+    def readMultiple(self, args, *otherArgs, **kwargs):
+        request = kwargs.get("request_dict")
+        address = request["address"] if request is not None else args.split(" ")[0]
+        return self.__request("readPropertyMultiple", address, self.bacnet.readMultiple, args, *otherArgs, **kwargs)
+
+    def whois(self, *args, **kwargs):
+        return self.__request("whoIs", "broadcast", self.bacnet.whois, *args, **kwargs)
+
+    def __request(self, service, address, function, *args, **kwargs):
+        started = time.perf_counter()
+        result = "ok"
+        try:
+            response = function(*args, **kwargs)
+            if service == "readPropertyMultiple" and "request_dict" in kwargs and type(response) != dict:
+                result = "error"
+            return response
+        except Exception as e:
+            # Compared by name, so that BAC0 does not have to be imported here
+            result = "timeout" if type(e).__name__ == "NoResponseFromController" else "error"
+            raise
+        finally:
+            self.registry.observe("bacnet_request_duration_seconds", time.perf_counter() - started,
+                                  device=address, service=service)
+            self.registry.inc("bacnet_requests_total", device=address, service=service, result=result)
+
+    def __getattr__(self, name):
+        return getattr(self.bacnet, name)
@@ -1,6 +1,3 @@
-import copy
-
-
 class RelationshipsBuilder:
     def __init__(self,
                  idAAS: str,
@@ -30,14 +27,7 @@ class RelationshipsBuilder:
                    idShort: str,
                    objectIdentifier: str):
         first, second = self.buildFirstAndSecond(objectIdentifier)
-        self.elements.append({
-            "idShort": idShort,
-            "modelType": {
-                "name": "RelationshipElement"
-            },
-            "first": first,
-            "second": second
-        })
+        self.elements.append(RelationshipElement(idShort, first, second))
 
     def buildFirstAndSecond(self, objectIdentifier):
         if objectIdentifier[0].isdigit():
@@ -46,11 +36,7 @@ class RelationshipsBuilder:
                 "idType": "IdShort",
                 "value": objectIdentifier,
                 "local": True}
-        first = copy.deepcopy(self.first)
-        second = copy.deepcopy(self.second)
-        first["keys"].append(var1)
-        second["keys"].append(var1)
-        return first, second
+        return Reference(self.first, var1), Reference(self.second, var1)
 
     def getElements(self):
         return self.elements
@@ -62,56 +48,53 @@ class RelationshipsBuilder:
                         idTypeAAS: str = "IRI",
                         idTypeAID: str = "IRI",
                         idTypeLiveDataSubmodel: str = "IRI"):
-        self.first = {
-            "keys": [
-                {
-                    "type": "AssetAdministrationShell",
-                    "idType": idTypeAAS,
-                    "value": idAAS,
-                    "local": True
-                },
-                {
-                    "type": "Submodel",
-                    "idType": idTypeAID,
-                    "value": idAID,
-                    "local": True
-                },
-                {
-                    "type": "SubmodelElementCollection",
-                    "idType": "IdShort",
-                    "value": "BACnetInterface",
-                    "local": True
-                },
-                {
-                    "type": "SubmodelElementCollection",
-                    "idType": "IdShort",
-                    "value": "InterfaceMetadata",
-                    "local": True
-                },
-                {
-                    "type": "SubmodelElementCollection",
-                    "idType": "IdShort",
-                    "value": "Properties",
-                    "local": True
-                }
-            ]
-        }
-        self.second = {
-            "keys": [
-                {
-                    "type": "AssetAdministrationShell",
-                    "idType": idTypeAAS,
-                    "value": idAAS,
-                    "local": True
-                },
-                {
-                    "type": "Submodel",
-                    "idType": idTypeLiveDataSubmodel,
-                    "value": idLiveDataSubmodel,
-                    "local": True
-                }
-            ]
-        }
+        # Key chains shared by the references of all objects, each reference only adds the key of its object
+        self.first = [
+            {
+                "type": "AssetAdministrationShell",
+                "idType": idTypeAAS,
+                "value": idAAS,
+                "local": True
+            },
+            {
+                "type": "Submodel",
+                "idType": idTypeAID,
+                "value": idAID,
+                "local": True
+            },
+            {
+                "type": "SubmodelElementCollection",
+                "idType": "IdShort",
+                "value": "BACnetInterface",
+                "local": True
+            },
+            {
+                "type": "SubmodelElementCollection",
+                "idType": "IdShort",
+                "value": "InterfaceMetadata",
+                "local": True
+            },
+            {
+                "type": "SubmodelElementCollection",
+                "idType": "IdShort",
+                "value": "Properties",
+                "local": True
+            }
+        ]
+        self.second = [
+            {
+                "type": "AssetAdministrationShell",
+                "idType": idTypeAAS,
+                "value": idAAS,
+                "local": True
+            },
+            {
+                "type": "Submodel",
+                "idType": idTypeLiveDataSubmodel,
+                "value": idLiveDataSubmodel,
+                "local": True
+            }
+        ]
 
 
 class AssetInterfaceMappingConfigurationBuilder:
@@ -315,33 +298,148 @@ class AssetAdministrationShellBuilder:
         return self.aas
 
 
-class SubmodelBuilder:
+# Shared defaults of the element model below. They are only used for serialization and must not be modified.
+EMPTY_REFERENCE = {"keys": []}
+EMPTY_LIST = []
+MODEL_TYPE_SUBMODEL = {"name": "Submodel"}
+MODEL_TYPE_COLLECTION = {"name": "SubmodelElementCollection"}
+MODEL_TYPE_PROPERTY = {"name": "Property"}
+MODEL_TYPE_RELATIONSHIP = {"name": "RelationshipElement"}
+
+
+class Element:
+    """Compact submodel element. The AAS JSON of an element is only created by toDict while it is serialized, the
+    element itself supports reading its keys like the dict it replaces, e.g. element["value"].append(...)."""
+    __slots__ = ()
+
+    def toDict(self) -> dict:
+        raise NotImplementedError
+
+    def keys(self):
+        return self.toDict().keys()
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        return self.toDict()[key]
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+
+class Submodel(Element):
+    __slots__ = ("semanticId", "identification", "idShort", "kind", "submodelElements")
+
     def __init__(self, id: str, idShort: str, idType: str = "Custom", kind: str = "Instance"):
-        self.submodel = {
-            "semanticId": {"keys": []},
-            "identification": {"idType": idType, "id": id},
-            "idShort": idShort,
-            "kind": kind,
-            "dataSpecification": [],
-            "qualifiers": [],
-            "modelType": {"name": "Submodel"},
-            "embeddedDataSpecifications": [],
-            "submodelElements": []
+        self.semanticId = EMPTY_REFERENCE
+        self.identification = {"idType": idType, "id": id}
+        self.idShort = idShort
+        self.kind = kind
+        self.submodelElements = []
+
+    def toDict(self) -> dict:
+        return {
+            "semanticId": self.semanticId,
+            "identification": self.identification,
+            "idShort": self.idShort,
+            "kind": self.kind,
+            "dataSpecification": EMPTY_LIST,
+            "qualifiers": EMPTY_LIST,
+            "modelType": MODEL_TYPE_SUBMODEL,
+            "embeddedDataSpecifications": EMPTY_LIST,
+            "submodelElements": self.submodelElements
+        }
+
+
+class SubmodelElementCollection(Element):
+    __slots__ = ("ordered", "idShort", "kind", "value", "allowDuplicates")
+
+    def __init__(self, idShort: str, kind: str = "Instance", ordered: bool = False, allowDuplicates: bool = False):
+        self.ordered = ordered
+        self.idShort = idShort
+        self.kind = kind
+        self.value = []
+        self.allowDuplicates = allowDuplicates
+
+    def toDict(self) -> dict:
+        return {
+            "ordered": self.ordered,
+            "parent": EMPTY_REFERENCE,
+            "semanticId": EMPTY_REFERENCE,
+            "idShort": self.idShort,
+            "kind": self.kind,
+            "qualifiers": EMPTY_LIST,
+            "modelType": MODEL_TYPE_COLLECTION,
+            "value": self.value,
+            "allowDuplicates": self.allowDuplicates
+        }
+
+
+class Property(Element):
+    __slots__ = ("idShort", "kind", "valueType", "value")
+
+    def __init__(self, idShort: str, kind: str = "Instance", valueType: str = "string", value: str = ""):
+        self.idShort = idShort
+        self.kind = kind
+        self.valueType = valueType
+        self.value = value
+
+    def toDict(self) -> dict:
+        return {
+            "semanticId": EMPTY_REFERENCE,
+            "idShort": self.idShort,
+            "kind": self.kind,
+            "valueType": self.valueType,
+            "qualifiers": EMPTY_LIST,
+            "modelType": MODEL_TYPE_PROPERTY,
+            "value": self.value
+        }
+
+
+class Reference(Element):
+    __slots__ = ("prefix", "key")
+
+    def __init__(self, prefix: list, key: dict):
+        self.prefix = prefix
+        self.key = key
+
+    def toDict(self) -> dict:
+        return {"keys": self.prefix + [self.key]}
+
+
+class RelationshipElement(Element):
+    __slots__ = ("idShort", "first", "second")
+
+    def __init__(self, idShort: str, first: Reference, second: Reference):
+        self.idShort = idShort
+        self.first = first
+        self.second = second
+
+    def toDict(self) -> dict:
+        return {
+            "idShort": self.idShort,
+            "modelType": MODEL_TYPE_RELATIONSHIP,
+            "first": self.first,
+            "second": self.second
         }
 
-    def addSubmodelElement(self, submodelElement: dict):
-        self.submodel["submodelElements"].append(submodelElement)
 
-    def addSubmodelElements(self, submodelElements: list[dict]):
+class SubmodelBuilder:
+    def __init__(self, id: str, idShort: str, idType: str = "Custom", kind: str = "Instance"):
+        self.submodel = Submodel(id, idShort, idType, kind)
+
+    def addSubmodelElement(self, submodelElement):
+        self.submodel.submodelElements.append(submodelElement)
+
+    def addSubmodelElements(self, submodelElements: list):
         for submodelElement in submodelElements:
             self.addSubmodelElement(submodelElement)
 
     def setSemanticId(self, semanticId: dict):
         if "keys" in semanticId.keys():
-            self.submodel["semanticId"] = semanticId
+            self.submodel.semanticId = semanticId
         else:
-            self.submodel["semanticId"]["keys"] = []
-            self.submodel["semanticId"]["keys"].append(semanticId)
+            self.submodel.semanticId = {"keys": [semanticId]}
 
     def build(self):
         return self.submodel
@@ -349,39 +447,20 @@ class SubmodelBuilder:
 
 class SubmodelElementCollectionBuilder:
     def __init__(self, idShort: str, kind: str = "Instance", ordered: bool = False, allowDuplicates: bool = False):
-        self.submodel_element_collection = {
-            "ordered": ordered,
-            "parent": {"keys": []},
-            "semanticId": {"keys": []},
-            "idShort": idShort,
-            "kind": kind,
-            "qualifiers": [],
-            "modelType": {"name": "SubmodelElementCollection"},
-            "value": [],
-            "allowDuplicates": allowDuplicates
-        }
+        self.submodel_element_collection = SubmodelElementCollection(idShort, kind, ordered, allowDuplicates)
 
-    def addElement(self, element: dict):
-        self.submodel_element_collection["value"].append(element)
+    def addElement(self, element):
+        self.submodel_element_collection.value.append(element)
 
     def build(self):
         return self.submodel_element_collection
 
 class PropertyBuilder:
     def __init__(self, idShort: str, kind: str = "Instance", valueType: str = "string", value: str = ""):
-        self.property = {
-            "semanticId": {"keys": []},
-            "idShort": idShort,
-            "kind": kind,
-            "valueType": valueType,
-            "qualifiers": [],
-            "modelType": {"name": "Property"},
-            "value": value
-        }
+        self.property = Property(idShort, kind, valueType, value)
 
     def setValue(self, value: str):
-        self.property["value"] = value
+        self.property.value = value
 
     def build(self):
         return self.property
-
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+
+from utils import utilClass
+
+
+class PropertyListCache:
+    def __init__(self, path: str, maxEntries: int = 1000, maxAgeDays: int = 90, sampleSize: int = 2):
+        self.path = path
+        self.maxEntries = maxEntries
+        self.maxAge = maxAgeDays * 24 * 60 * 60
+        self.sampleSize = sampleSize
+        self.lock = threading.Lock()
+        self.entries = self.__load()
+        # Time of every invalidation by key prefix, so that entries saved by other processes meanwhile are kept
+        self.invalidated = {}
+
+    def __load(self):
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            utilClass.doPrint(f"Property list cache '{self.path}' could not be read and is ignored: {e}")
+            return {}
+
+    @staticmethod
+    def getKey(deviceModel: tuple, objectType: str):
+        return "|".join([str(part) for part in deviceModel] + [objectType])
+
+    def get(self, deviceModel: tuple, objectType: str):
+        with self.lock:
+            entry = self.entries.get(self.getKey(deviceModel, objectType))
+            if entry is None:
+                return None
+            entry["lastUsed"] = time.time()
+            return entry["propertyList"]
+
+    def put(self, deviceModel: tuple, objectType: str, propertyList: list):
+        now = time.time()
+        with self.lock:
+            self.entries[self.getKey(deviceModel, objectType)] = {
+                "propertyList": propertyList,
+                "created": now,
+                "lastUsed": now
+            }
+
+    def invalidate(self, deviceModel: tuple = None, objectType: str = None):
+        with self.lock:
+            if deviceModel is None:
+                self.entries = {}
+                self.invalidated[""] = time.time()
+            elif objectType is None:
+                prefix = self.getKey(deviceModel, "")
+                self.entries = {key: entry for key, entry in self.entries.items() if not key.startswith(prefix)}
+                self.invalidated[prefix] = time.time()
+            else:
+                key = self.getKey(deviceModel, objectType)
+                self.entries.pop(key, None)
+                self.invalidated[key] = time.time()
+
+    def __isInvalidated(self, key, entry):
+        # Prefixes of a whole cache or device model end with the separator, others are the key of one object type
+        return any((key == prefix or prefix[-1:] in ("", "|") and key.startswith(prefix)) and entry["created"] <= invalidated
+                   for prefix, invalidated in self.invalidated.items())
+
+    def forDevice(self, deviceModel: tuple):
+        return DevicePropertyTemplates(self, deviceModel)
+
+    def save(self):
+        with self.lock:
+            # Processes of a sharded scan share the file: entries they saved since it was loaded are merged
+            for key, entry in self.__load().items():
+                if key not in self.entries.keys() and not self.__isInvalidated(key, entry):
+                    self.entries[key] = entry
+
+            now = time.time()
+            entries = {key: entry for key, entry in self.entries.items() if now - entry["created"] <= self.maxAge}
+            if len(entries) > self.maxEntries:
+                newest = sorted(entries.items(), key=lambda item: item[1]["lastUsed"], reverse=True)
+                entries = dict(newest[:self.maxEntries])
+            self.entries = entries
+
+            tmpPath = self.path + ".tmp"
+            with open(tmpPath, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmpPath, self.path)
+
+
+class DevicePropertyTemplates:
+    """The first sampleSize objects of each object type are still read live and checked against the cache. Types
+    whose live property lists are identical for every object are cached for the next device of the same model."""
+
+    def __init__(self, cache: PropertyListCache, deviceModel: tuple):
+        self.cache = cache
+        self.deviceModel = deviceModel
+        self.sampled = {}
+        self.rejected = set()
+        self.liveLists = {}
+        self.cachedTypes = set()
+
+    def plan(self, object):
+        objectType = str(object[0])
+        if objectType in self.rejected:
+            return None
+        cached = self.cache.get(self.deviceModel, objectType)
+        if cached is None:
+            return None
+        self.cachedTypes.add(objectType)
+        if self.sampled.get(objectType, 0) < self.cache.sampleSize:
+            self.sampled[objectType] = self.sampled.get(objectType, 0) + 1
+            return None
+        return cached
+
+    def isRejected(self, object):
+        return str(object[0]) in self.rejected
+
+    def record(self, object, propertyList: list):
+        objectType = str(object[0])
+        if objectType in self.cachedTypes and objectType not in self.rejected:
+            if self.cache.get(self.deviceModel, objectType) != propertyList:
+                utilClass.doPrint(f"Cached property list for '{objectType}' does not match the device, reading live")
+                self.rejected.add(objectType)
+                self.cache.invalidate(self.deviceModel, objectType)
+
+        if objectType not in self.liveLists:
+            self.liveLists[objectType] = propertyList
+        elif self.liveLists[objectType] != propertyList:
+            self.liveLists[objectType] = None
+
+    def finish(self):
+        for objectType, propertyList in self.liveLists.items():
+            if objectType in self.cachedTypes and objectType not in self.rejected:
+                continue
+            if propertyList is None:
+                self.cache.invalidate(self.deviceModel, objectType)
+            else:
+                self.cache.put(self.deviceModel, objectType, propertyList)
+        self.cache.save()
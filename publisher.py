@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+from patterns import Element
+from serialization import toJson, iterJson, isLarge
+from utils import utilClass
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+NOT_MODIFIED = 304
+
+
+class PublishState:
+    def __init__(self, path: str, verifyOnServer: bool = False):
+        self.path = path
+        self.verifyOnServer = verifyOnServer
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                utilClass.doPrint(f"Publish state '{self.path}' could not be read and is ignored: {e}")
+
+    def isUnchanged(self, url, contentHash, session, timeout):
+        with self.lock:
+            entry = self.entries.get(url)
+        if entry is None or entry["hash"] != contentHash:
+            return False
+        if not self.verifyOnServer:
+            return True
+
+        headers = {"If-None-Match": entry["etag"]} if entry.get("etag") else {}
+        started = time.perf_counter()
+        try:
+            r = session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            metrics.inc("http_requests_total", method="GET", status="error")
+            return False
+        finally:
+            metrics.observe("http_request_duration_seconds", time.perf_counter() - started, method="GET")
+        metrics.inc("http_requests_total", method="GET", status=r.status_code)
+        if r.status_code == NOT_MODIFIED:
+            return True
+        if r.status_code != 200:
+            return False
+        return entry.get("etag") is None or r.headers.get("ETag") == entry["etag"]
+
+    def update(self, url, contentHash, etag):
+        with self.lock:
+            self.entries[url] = {"hash": contentHash, "etag": etag}
+
+    def save(self):
+        with self.lock:
+            tmpPath = self.path + ".tmp"
+            with open(tmpPath, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmpPath, self.path)
+
+
+def hashContent(chunks):
+    contentHash = hashlib.sha256()
+    for chunk in chunks:
+        contentHash.update(chunk)
+    return contentHash.hexdigest()
+
+
+class AASPublisher:
+    def __init__(self, urlServer: str, concurrency: int = 4, timeout: float = 30, tries: int = 5,
+                 streamThreshold: int = 10000, publishState: PublishState = None, connections: int = None):
+        self.urlServer = urlServer
+        self.timeout = timeout
+        self.tries = tries
+        self.streamThreshold = streamThreshold
+        self.publishState = publishState
+        self.countLock = threading.Lock()
+        self.uploaded = 0
+        self.skipped = 0
+
+        self.session = requests.Session()
+        # Callers publishing several shells at once need a connection per caller next to the submodel uploads
+        connections = connections or concurrency
+        adapter = HTTPAdapter(pool_connections=connections, pool_maxsize=connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def putElement(self, url, element):
+        stream = isLarge(element, self.streamThreshold)
+        body = None if stream else toJson(element)
+
+        contentHash = None
+        if self.publishState is not None:
+            contentHash = hashContent(iterJson(element) if stream else [body])
+            if self.publishState.isUnchanged(url, contentHash, self.session, self.timeout):
+                self.__count(skipped=1)
+                metrics.inc("publish_skipped_total")
+                return NOT_MODIFIED
+
+        r = self.__put(url, lambda: iterJson(element) if stream else body)
+        if r is None:
+            if isinstance(element, (dict, Element)):
+                utilClass.doPrint(
+                    f"Failed to publish element: idShort: '{element['idShort']}', id: '{element['identification']['id']}'",
+                    level=logging.ERROR)
+            else:
+                utilClass.doPrint(f"Failed to publish element to '{url}'", level=logging.ERROR)
+            return 400
+        if r.status_code != 200:
+            if isinstance(element, (dict, Element)):
+                if "idShort" in element.keys():
+                    utilClass.doPrint(element["idShort"], level=logging.WARNING)
+        else:
+            self.__count(uploaded=1)
+            if self.publishState is not None:
+                self.publishState.update(url, contentHash, r.headers.get("ETag"))
+        return r.status_code
+
+    def putValue(self, url, value):
+        """Sets the value of a single submodel element, without the publish state."""
+        r = self.__put(url, lambda: toJson(value))
+        if r is None:
+            utilClass.doPrint(f"Failed to set value of '{url}'", level=logging.ERROR)
+            return 400
+        return r.status_code
+
+    def putValues(self, values: dict):
+        """Sets the values of several submodel elements concurrently, returns the urls that were set."""
+        urls = list(values.keys())
+        statusCodes = self.executor.map(lambda url: self.putValue(url, values[url]), urls)
+        return [url for url, statusCode in zip(urls, statusCodes) if statusCode == 200]
+
+    def __put(self, url, getData):
+        # Returns the response, or None if every try failed with a connection error
+        tries = 0
+        while tries < self.tries:
+            if tries > 0:
+                metrics.inc("http_retries_total")
+            started = time.perf_counter()
+            try:
+                r = self.session.put(url, data=getData(), headers=JSON_HEADERS, timeout=self.timeout)
+                metrics.observe("http_request_duration_seconds", time.perf_counter() - started, method="PUT")
+                metrics.inc("http_requests_total", method="PUT", status=r.status_code)
+                if r.status_code != 200:
+                    utilClass.doPrint(r.status_code, level=logging.WARNING)
+                    utilClass.doPrint(r.text, level=logging.WARNING)
+                return r
+            except requests.RequestException:
+                metrics.observe("http_request_duration_seconds", time.perf_counter() - started, method="PUT")
+                metrics.inc("http_requests_total", method="PUT", status="error")
+                tries += 1
+        return None
+
+    def publishAAS(self, aasId, aas, submodels: list, deviceLabel: str):
+        response_code = self.putElement(self.urlServer + aasId, aas)
+        if response_code == NOT_MODIFIED:
+            utilClass.doPrint(f"AAS '{aasId}' for device '{deviceLabel}' is unchanged, not uploaded")
+        elif response_code != 200:
+            utilClass.doPrint(f"Skipping submodels of AAS '{aasId}' as the AAS could not be published", level=logging.ERROR)
+            return False
+        else:
+            utilClass.doPrint(f"Published AAS '{aasId}' for device '{deviceLabel}'")
+
+        context = utilClass.getDeviceContext()
+        futures = [self.executor.submit(self.__publishSubmodel, aasId, submodel, context) for submodel in submodels]
+        return all([future.result() for future in futures])
+
+    def __publishSubmodel(self, aasId, submodel, context):
+        utilClass.setDeviceContext(context)
+        try:
+            idShortSM = submodel["idShort"]
+            response_code = self.putElement(self.urlServer + aasId + "/aas/submodels/" + idShortSM, submodel)
+            if response_code == 200:
+                utilClass.doPrint(f"Added Submodel '{idShortSM}' to AAS '{aasId}'")
+            elif response_code == NOT_MODIFIED:
+                utilClass.doPrint(f"Submodel '{idShortSM}' of AAS '{aasId}' is unchanged, not uploaded")
+            return response_code in (200, NOT_MODIFIED)
+        finally:
+            utilClass.setDeviceContext(None)
+
+    def __count(self, uploaded=0, skipped=0):
+        with self.countLock:
+            self.uploaded += uploaded
+            self.skipped += skipped
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+        if self.publishState is not None:
+            self.publishState.save()
+            utilClass.doPrint(f"Uploads: {self.uploaded}, unchanged and avoided: {self.skipped}")
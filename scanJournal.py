@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+
+from utils import utilClass
+
+CHECKPOINT_INTERVAL = 10.0
+
+
+class ScanJournal:
+    """Journal of the browse progress of a scan as JSON lines: the property lists read per device, written at most
+    every CHECKPOINT_INTERVAL seconds, and the devices that were completely published. A resumed scan skips the
+    completed devices and browses the others with the property lists already read. The journal is removed when
+    every device it contains was completed."""
+
+    def __init__(self, path: str, resume: bool = False, checkpointInterval: float = CHECKPOINT_INTERVAL):
+        self.path = path
+        self.checkpointInterval = checkpointInterval
+        self.lock = threading.Lock()
+        self.started = set()
+        self.completed = set()
+        self.propertyLists = {}
+        self.pending = {}
+        self.lastCheckpoint = time.monotonic()
+
+        if resume and os.path.isfile(self.path):
+            self.__load()
+            utilClass.doPrint(f"Resuming scan from journal '{self.path}': {len(self.completed)} devices completed, "
+                              f"{len(self.started - self.completed)} partly browsed")
+        elif resume:
+            utilClass.doPrint(f"No journal '{self.path}' to resume from, starting a new scan")
+        elif os.path.isfile(self.path):
+            utilClass.doPrint(f"Replacing journal '{self.path}' of an earlier scan, use -resume to continue it")
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def __load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line is incomplete if the process was killed while writing it
+                    continue
+                deviceId = entry["deviceId"]
+                self.started.add(deviceId)
+                if entry.get("completed"):
+                    self.completed.add(deviceId)
+                    self.propertyLists.pop(deviceId, None)
+                else:
+                    self.propertyLists.setdefault(deviceId, {}).update(entry["propertyLists"])
+
+    def isCompleted(self, deviceId):
+        with self.lock:
+            return deviceId in self.completed
+
+    def begin(self, deviceId):
+        with self.lock:
+            self.started.add(deviceId)
+
+    def getPropertyLists(self, deviceId):
+        with self.lock:
+            return dict(self.propertyLists.get(deviceId, {}))
+
+    def record(self, deviceId, propertyLists: dict):
+        with self.lock:
+            self.pending.setdefault(deviceId, {}).update(propertyLists)
+            if time.monotonic() - self.lastCheckpoint >= self.checkpointInterval:
+                self.__checkpoint()
+
+    def complete(self, deviceId):
+        with self.lock:
+            self.pending.pop(deviceId, None)
+            self.propertyLists.pop(deviceId, None)
+            self.completed.add(deviceId)
+            self.__write([{"deviceId": deviceId, "completed": True}])
+
+    def __checkpoint(self):
+        entries = [{"deviceId": deviceId, "propertyLists": propertyLists}
+                   for deviceId, propertyLists in self.pending.items()]
+        self.pending = {}
+        self.lastCheckpoint = time.monotonic()
+        if len(entries) > 0:
+            self.__write(entries)
+
+    def __write(self, entries):
+        for entry in entries:
+            self.file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            self.__checkpoint()
+            self.file.close()
+            incomplete = self.started - self.completed
+        if len(incomplete) == 0:
+            os.remove(self.path)
+        else:
+            utilClass.doPrint(f"{len(incomplete)} devices were not completed, continue the scan with -resume "
+                              f"(journal '{self.path}')")
@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+import time
+
+from utils import utilClass
+
+
+def hashObjectList(objectList):
+    normalized = [[str(object[0]), int(object[1])] for object in objectList]
+    return hashlib.sha1(json.dumps(normalized, separators=(",", ":")).encode()).hexdigest()
+
+
+class ScanRecordStore:
+    def __init__(self, directory: str, ignoreExisting: bool = False):
+        self.directory = directory
+        self.ignoreExisting = ignoreExisting
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __getPath(self, deviceId):
+        return os.path.join(self.directory, f"device_{deviceId}.json")
+
+    def get(self, deviceId):
+        path = self.__getPath(deviceId)
+        if self.ignoreExisting or not os.path.isfile(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            utilClass.doPrint(f"Scan record '{path}' could not be read and is ignored: {e}")
+            return None
+
+    def put(self, deviceId, address, databaseRevision, objectList, objectPropMap: dict):
+        record = {
+            "deviceId": deviceId,
+            "address": address,
+            "databaseRevision": databaseRevision,
+            "objectListHash": hashObjectList(objectList),
+            "objectList": [[str(object[0]), int(object[1])] for object in objectList],
+            "propertyLists": objectPropMap,
+            "scanned": time.time()
+        }
+        path = self.__getPath(deviceId)
+        tmpPath = path + ".tmp"
+        with open(tmpPath, "w") as f:
+            json.dump(record, f)
+        os.replace(tmpPath, path)
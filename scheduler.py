@@ -0,0 +1,157 @@
+import threading
+import time
+
+from metrics import metrics
+
+# Smoothing factor of the round trip time, as for TCP
+RTT_SMOOTHING = 0.125
+# The limit only grows while the smoothed round trip time stays below this multiple of the lowest one
+RTT_TOLERANCE = 2.0
+# Absolute slack in seconds, so that jitter of very short round trips is not taken for congestion
+RTT_SLACK = 0.01
+# The lowest round trip time is measured again after this many seconds, so it follows lasting changes
+MIN_RTT_WINDOW = 60.0
+CONGESTION_RETRIES = 2
+
+
+def getNetworkKey(address):
+    """Routed devices are addressed as <network>:<mac> and grouped by their network number, devices on the local
+    IP network by their IP address."""
+    address = str(address)
+    network, separator, mac = address.partition(":")
+    if separator and network.isdigit():
+        return f"network {network}"
+    return network
+
+
+class RttEstimate:
+    __slots__ = ("smoothed", "minimum", "minimumSince")
+
+    def __init__(self):
+        self.smoothed = None
+        self.minimum = None
+        self.minimumSince = time.monotonic()
+
+    def update(self, rtt):
+        now = time.monotonic()
+        if self.minimum is None or rtt < self.minimum or now - self.minimumSince > MIN_RTT_WINDOW:
+            self.minimum = rtt
+            self.minimumSince = now
+        if self.smoothed is None:
+            self.smoothed = rtt
+        else:
+            self.smoothed += RTT_SMOOTHING * (rtt - self.smoothed)
+
+    def isInflated(self):
+        return self.smoothed > self.minimum * RTT_TOLERANCE + RTT_SLACK
+
+
+class AdaptiveLimit:
+    """Limit of outstanding requests to one network, increased by one per round trip while responses are fast and
+    halved on timeouts (additive increase, multiplicative decrease)."""
+
+    def __init__(self, network: str, initial: int, maximum: int):
+        self.network = network
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.outstanding = 0
+        self.condition = threading.Condition()
+        # Per service, as a ReadPropertyMultiple takes longer than a ReadProperty without any congestion
+        self.rtts = {}
+        self.lastDecrease = 0.0
+
+    def acquire(self):
+        """Waits for a free slot and returns the number of outstanding requests including this one."""
+        with self.condition:
+            while self.outstanding >= int(self.limit):
+                self.condition.wait()
+            self.outstanding += 1
+            return self.outstanding
+
+    def release(self, service: str, started: float, rtt: float, timeout: bool, outstanding: int):
+        """Returns the number of outstanding requests including this one when it was answered."""
+        with self.condition:
+            outstandingAtEnd = self.outstanding
+            self.outstanding -= 1
+            if timeout:
+                # Requests sent before the last decrease were sent with the old limit and do not decrease it again
+                if started >= self.lastDecrease:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.lastDecrease = time.monotonic()
+                    metrics.inc("bacnet_limit_decreases_total", network=self.network)
+            else:
+                if service not in self.rtts.keys():
+                    self.rtts[service] = RttEstimate()
+                estimate = self.rtts[service]
+                estimate.update(rtt)
+                if estimate.isInflated():
+                    if self.limit > 1:
+                        self.limit = max(1.0, self.limit - 1 / self.limit)
+                elif outstanding >= int(self.limit):
+                    # Only grows while the limit is used, otherwise a large limit would not be tested
+                    self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self.condition.notify_all()
+            return outstandingAtEnd
+
+
+class RequestScheduler:
+    """Proxy of a BAC0 application that limits the outstanding read and readMultiple requests per BACnet network or
+    IP address. Requests beyond the limit of their network wait until an earlier one is answered."""
+
+    def __init__(self, bacnet, initialLimit: int = 2, maxLimit: int = 8):
+        self.bacnet = bacnet
+        self.initialLimit = min(initialLimit, maxLimit)
+        self.maxLimit = maxLimit
+        self.lock = threading.Lock()
+        self.limits = {}
+
+    def read(self, args, *otherArgs, **kwargs):
+        return self.__request("readProperty", args.split(" ")[0], self.bacnet.read, args, *otherArgs, **kwargs)
+
+    def readMultiple(self, args, *otherArgs, **kwargs):
+        request = kwargs.get("request_dict")
+        address = request["address"] if request is not None else args.split(" ")[0]
+        return self.__request("readPropertyMultiple", address, self.bacnet.readMultiple, args, *otherArgs, **kwargs)
+
+    def getLimit(self, address) -> AdaptiveLimit:
+        network = getNetworkKey(address)
+        with self.lock:
+            limit = self.limits.get(network)
+            if limit is None:
+                limit = self.limits[network] = AdaptiveLimit(network, self.initialLimit, self.maxLimit)
+            return limit
+
+    def __request(self, service, address, function, *args, **kwargs):
+        limit = self.getLimit(address)
+        tries = 0
+        while True:
+            queued = time.monotonic()
+            outstanding = limit.acquire()
+            started = time.monotonic()
+            metrics.observe("bacnet_queue_wait_seconds", started - queued, network=limit.network)
+            try:
+                response = function(*args, **kwargs)
+            except Exception as e:
+                # Compared by name, so that BAC0 does not have to be imported here
+                timeout = type(e).__name__ == "NoResponseFromController"
+                outstandingAtEnd = limit.release(service, started, time.monotonic() - started, timeout, outstanding)
+                # A timeout while other requests to the network were outstanding may be caused by the load and is
+                # repeated with the decreased limit, a timeout of a single request is passed on
+                if not timeout or max(outstanding, outstandingAtEnd) == 1 or tries >= CONGESTION_RETRIES:
+                    raise
+            else:
+                # BAC0's readMultiple does not raise on a timeout or abort, it returns a list instead of a dict
+                timeout = service == "readPropertyMultiple" and kwargs.get("request_dict") is not None \
+                    and type(response) != dict
+                outstandingAtEnd = limit.release(service, started, time.monotonic() - started, timeout, outstanding)
+                if not timeout or max(outstanding, outstandingAtEnd) == 1 or tries >= CONGESTION_RETRIES:
+                    return response
+            tries += 1
+            metrics.inc("bacnet_retries_total", device=address)
+
+    def getLimits(self):
+        with self.lock:
+            return {network: int(limit.limit) for network, limit in sorted(self.limits.items())}
+
+    def __getattr__(self, name):
+        return getattr(self.bacnet, name)
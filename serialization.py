@@ -0,0 +1,61 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from patterns import Element
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def toSerializable(element):
+    # Elements of the compact model in patterns.py are turned into their AAS JSON only while they are serialized
+    if isinstance(element, Element):
+        return element.toDict()
+    raise TypeError(f"Object of type {type(element).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=toSerializable)
+
+
+def toJson(element) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(element, default=toSerializable)
+    return _encoder.encode(element).encode("utf-8")
+
+
+def iterJson(element, chunkSize: int = STREAM_CHUNK_SIZE):
+    buffer = []
+    size = 0
+    for part in _encoder.iterencode(element):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunkSize:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def countElements(element, limit: int):
+    # Counts nested submodel elements, stopping as soon as the limit is reached
+    count = 0
+    pending = [element]
+    while pending and count < limit:
+        current = pending.pop()
+        for key in ("submodelElements", "value"):
+            if type(current) == dict:
+                children = current.get(key)
+            else:
+                children = getattr(current, key, None)
+            if type(children) == list:
+                count += len(children)
+                pending.extend(children)
+    return count
+
+
+def isLarge(element, threshold: int):
+    return threshold > 0 and countElements(element, threshold) >= threshold
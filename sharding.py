@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import queue
+
+from scheduler import getNetworkKey
+from utils import utilClass
+
+# How often the coordinator checks for shard processes that exited without finishing
+SHARD_CHECK_INTERVAL = 1.0
+
+
+def splitDevices(devices, count):
+    """Splits the devices into at most count shards of about the same size. The devices of one BACnet network stay in
+    the same shard, so that the outstanding request limit of the network is kept by a single process."""
+    networks = {}
+    for device in devices:
+        networks.setdefault(getNetworkKey(device[2]), []).append(device)
+    shards = [[] for _ in range(min(count, len(networks)))]
+    for networkDevices in sorted(networks.values(), key=len, reverse=True):
+        min(shards, key=len).extend(networkDevices)
+    return shards
+
+
+class ShardContext:
+    """Connection of a shard process to the coordinator, which publishes the browsed devices and keeps the journal."""
+
+    def __init__(self, index: int, messages, liveData: bool):
+        self.index = index
+        self.messages = messages
+        self.liveData = liveData
+
+    def sendDevice(self, *device):
+        self.messages.put(("device", self.index, device))
+
+    def sendPropertyLists(self, deviceId, propertyLists: dict):
+        self.messages.put(("propertyLists", self.index, deviceId, propertyLists))
+
+    def finish(self):
+        self.messages.put(("done", self.index))
+
+
+class ShardJournal:
+    """Journal of a shard process. The property lists are recorded in the journal of the coordinator, which skips the
+    completed devices before splitting them and completes the others when it published them."""
+
+    def __init__(self, shard: ShardContext, propertyLists: dict):
+        self.shard = shard
+        self.propertyLists = propertyLists
+
+    def isCompleted(self, deviceId):
+        return False
+
+    def begin(self, deviceId):
+        pass
+
+    def getPropertyLists(self, deviceId):
+        return dict(self.propertyLists.get(deviceId, {}))
+
+    def record(self, deviceId, propertyLists: dict):
+        self.shard.sendPropertyLists(deviceId, propertyLists)
+
+
+class ShardProcesses:
+    """Worker processes of a sharded scan. They are spawned rather than forked, so that none of them inherits the
+    BACnet stack or the threads of the coordinator."""
+
+    def __init__(self, target):
+        self.target = target
+        self.context = multiprocessing.get_context("spawn")
+        self.messages = self.context.Queue()
+        self.processes = []
+
+    def start(self, *args):
+        index = len(self.processes)
+        process = self.context.Process(target=self.target, args=(index, self.messages) + args, name=f"shard{index}")
+        process.start()
+        self.processes.append(process)
+
+    def iterMessages(self):
+        """Yields the messages of the shards until every shard finished or exited."""
+        running = set(range(len(self.processes)))
+        while len(running) > 0:
+            try:
+                message = self.messages.get(timeout=SHARD_CHECK_INTERVAL)
+            except queue.Empty:
+                for index in sorted(running):
+                    process = self.processes[index]
+                    if not process.is_alive():
+                        utilClass.doPrint(f"Shard {index} exited with code {process.exitcode} before it finished",
+                                          level=logging.ERROR)
+                        running.discard(index)
+                continue
+            if message[0] == "done":
+                running.discard(message[1])
+            else:
+                yield message
+
+    def join(self):
+        for process in self.processes:
+            process.join()
+
+    def terminate(self):
+        """Stops the shards that are still running, e.g. after the coordinator was interrupted, as nobody would read
+        their messages anymore."""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
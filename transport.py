@@ -0,0 +1,178 @@
+import gzip
+import importlib
+import json
+import threading
+import time
+from collections import defaultdict
+
+RECORDING_VERSION = 1
+BROADCAST_RANGE = (0, 4194303)
+
+
+def encodeValue(value):
+    # JSON with tags for the types BAC0 returns that JSON cannot represent
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    if type(value) == list:
+        return [encodeValue(item) for item in value]
+    if type(value) == tuple:
+        return {"$tuple": [encodeValue(item) for item in value]}
+    if type(value) == dict:
+        return {"$dict": [[encodeValue(key), encodeValue(item)] for key, item in value.items()]}
+    return {"$str": str(value)}
+
+
+def decodeValue(value):
+    if type(value) == list:
+        return [decodeValue(item) for item in value]
+    if type(value) != dict:
+        return value
+    if "$tuple" in value.keys():
+        return tuple(decodeValue(item) for item in value["$tuple"])
+    if "$dict" in value.keys():
+        return {decodeValue(key): decodeValue(item) for key, item in value["$dict"]}
+    return value["$str"]
+
+
+def encodeException(exception):
+    return {"module": type(exception).__module__, "name": type(exception).__name__,
+            "args": [str(arg) for arg in exception.args]}
+
+
+def decodeException(encoded):
+    try:
+        exceptionClass = getattr(importlib.import_module(encoded["module"]), encoded["name"])
+        return exceptionClass(*encoded["args"])
+    except (ImportError, AttributeError, TypeError):
+        return RuntimeError(f"{encoded['module']}.{encoded['name']}: {', '.join(encoded['args'])}")
+
+
+def getRequestKey(method, args, kwargs):
+    return json.dumps([method, encodeValue(list(args)), encodeValue(kwargs)], sort_keys=True, separators=(",", ":"))
+
+
+class RecordingTransport:
+    """Passes every request to the BAC0 application and records it with its response or exception, so that the scan
+    can be repeated later from the recording by ReplayTransport."""
+
+    def __init__(self, bacnet, path: str):
+        self.bacnet = bacnet
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.__write({"version": RECORDING_VERSION, "created": time.time()})
+
+    def __write(self, entry):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.file.write(line)
+
+    def __record(self, method, function, args, kwargs):
+        entry = {"method": method, "args": encodeValue(list(args)), "kwargs": encodeValue(kwargs)}
+        try:
+            response = function(*args, **kwargs)
+        except Exception as e:
+            entry["exception"] = encodeException(e)
+            self.__write(entry)
+            raise
+        entry["response"] = encodeValue(response)
+        self.__write(entry)
+        return response
+
+    def read(self, *args, **kwargs):
+        return self.__record("read", self.bacnet.read, args, kwargs)
+
+    def readMultiple(self, *args, **kwargs):
+        return self.__record("readMultiple", self.bacnet.readMultiple, args, kwargs)
+
+    def whois(self, *args, **kwargs):
+        return self.bacnet.whois(*args, **kwargs)
+
+    @property
+    def devices(self):
+        devices = self.bacnet.devices
+        self.__write({"method": "devices", "response": encodeValue(list(devices))})
+        return devices
+
+    def __getattr__(self, name):
+        return getattr(self.bacnet, name)
+
+    def close(self):
+        iAms = [[str(address), deviceId] for address, deviceId in list(self.bacnet.this_application.i_am_counter.keys())]
+        self.__write({"method": "iAm", "response": iAms})
+        with self.lock:
+            self.file.close()
+
+
+class ReplayApplication:
+    def __init__(self):
+        self.i_am_counter = defaultdict(int)
+
+
+class ReplayTransport:
+    """Answers requests from a recording of RecordingTransport without network access. Repeated requests get their
+    recorded responses in order, requests that were not recorded are answered with NoResponseFromController."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.this_application = ReplayApplication()
+        self.responses = defaultdict(list)
+        self.iAms = []
+        self.recordedDevices = []
+        self.__load()
+
+    def __load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != RECORDING_VERSION:
+                raise ValueError(f"Recording '{self.path}' has unsupported version {header.get('version')}")
+            for line in f:
+                entry = json.loads(line)
+                if entry["method"] == "iAm":
+                    self.iAms = [(address, deviceId) for address, deviceId in entry["response"]]
+                elif entry["method"] == "devices":
+                    self.recordedDevices = decodeValue(entry["response"])
+                else:
+                    key = getRequestKey(entry["method"], decodeValue(entry["args"]), decodeValue(entry["kwargs"]))
+                    self.responses[key].append(entry)
+
+    def __replay(self, method, args, kwargs):
+        key = getRequestKey(method, args, kwargs)
+        with self.lock:
+            entries = self.responses.get(key)
+            if not entries:
+                entry = None
+            elif len(entries) > 1:
+                entry = entries.pop(0)
+            else:
+                entry = entries[0]
+        if entry is None:
+            raise decodeException({"module": "BAC0.core.io.IOExceptions", "name": "NoResponseFromController",
+                                   "args": [f"Request not recorded: {method} {args[0] if args else ''}"]})
+        if "exception" in entry.keys():
+            raise decodeException(entry["exception"])
+        return decodeValue(entry["response"])
+
+    def read(self, *args, **kwargs):
+        return self.__replay("read", args, kwargs)
+
+    def readMultiple(self, *args, **kwargs):
+        return self.__replay("readMultiple", args, kwargs)
+
+    def whois(self, *args, **kwargs):
+        low, high = BROADCAST_RANGE
+        if len(args) > 0 and args[0] is not None and len(args[0].split()) == 2:
+            low, high = [int(limit) for limit in args[0].split()]
+        for address, deviceId in self.iAms:
+            if low <= deviceId <= high:
+                self.this_application.i_am_counter[(address, deviceId)] += 1
+        return list(self.this_application.i_am_counter.keys())
+
+    @property
+    def devices(self):
+        iAms = set(self.this_application.i_am_counter.keys())
+        return [device for device in self.recordedDevices if (str(device[2]), device[3]) in iAms]
+
+    def close(self):
+        pass
@@ -1,13 +1,32 @@
 import json
+import logging
 import os
+import re
+import threading
 import time
-from datetime import datetime
+
+import logBackend
 
 
 class ConfigManager:
+    SCHEME_NAMES = ("schemeIdAas", "schemeIdAid", "schemeIdAimc", "schemeIdLiveData")
+
     def __init__(self, pathConfigFile: str = None):
         self.jsonConfig, self.pathConfigFile = self.__loadConfigFile(pathConfigFile)
         self.DEFAULT_ID_TYPE = "IRI"
+        self.__schemes = None
+        self.__lock = threading.Lock()
+        self.__printed = set()
+
+    def __getstate__(self):
+        # Passed to the processes of a sharded scan, which create their own lock
+        state = dict(self.__dict__)
+        del state["_ConfigManager__lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
 
     def __loadConfigFile(self, pathConfigFile):
         if pathConfigFile == None:
@@ -35,11 +54,198 @@ class ConfigManager:
                 try:
                     devices.append(int(deviceId))
                 except ValueError:
-                    print(f"Provided DeviceId '{deviceId}' is invalid and therefor ignored.")
+                    utilClass.doPrint(f"Provided DeviceId '{deviceId}' is invalid and therefor ignored.")
         return devices
 
 
 
+    def overrideOption(self, name, value):
+        self.jsonConfig[name] = value
+
+    def getWorkers(self):
+        return self.__getPositiveNumber("workers", 1)
+
+    def getPublishConcurrency(self):
+        return self.__getPositiveNumber("publishConcurrency", 4)
+
+    def getPublishTries(self):
+        return self.__getPositiveNumber("publishTries", 5)
+
+    def getUploadWorkers(self):
+        return self.__getPositiveNumber("uploadWorkers", 4)
+
+    def getStreamThreshold(self):
+        if "streamThreshold" in self.jsonConfig.keys() and self.jsonConfig["streamThreshold"] in (0, "0"):
+            return 0
+        return self.__getPositiveNumber("streamThreshold", 10000)
+
+    def getPublishStateSettings(self):
+        if "publishState" not in self.jsonConfig.keys():
+            return None
+        settings = self.jsonConfig["publishState"]
+        if type(settings) == str:
+            settings = {"path": settings}
+        elif type(settings) != dict or "path" not in settings.keys():
+            utilClass.doPrint(f"Value of key publishState should be a path or a JSON-object with key 'path'. Unchanged uploads are not skipped.")
+            return None
+        return {
+            "path": settings["path"],
+            "verifyOnServer": settings.get("verifyOnServer", False) in (True, "true", "True")
+        }
+
+    def getExportSettings(self):
+        if "export" not in self.jsonConfig.keys():
+            return None
+        settings = self.jsonConfig["export"]
+        if type(settings) == str:
+            settings = {"directory": settings}
+        elif type(settings) != dict or "directory" not in settings.keys():
+            utilClass.doPrint(f"Value of key export should be a path or a JSON-object with key 'directory'. Export disabled.")
+            return None
+
+        exportFormat = settings.get("format", "json")
+        if exportFormat not in ("json", "aasx"):
+            self.__printOnce(f"Value of key format in export should be 'json' or 'aasx', is '{exportFormat}'. Defaulting to: 'json'")
+            exportFormat = "json"
+        return {"directory": settings["directory"], "exportFormat": exportFormat}
+
+    def getLogSettings(self):
+        level = str(self.jsonConfig.get("logLevel", "INFO")).upper()
+        if level not in logBackend.LEVELS:
+            self.__printOnce(f"Value of key logLevel should be one of {', '.join(logBackend.LEVELS)}, is '{level}'. Defaulting to: 'INFO'")
+            level = "INFO"
+        logFormat = self.jsonConfig.get("logFormat", "text")
+        if logFormat not in ("text", "json"):
+            self.__printOnce(f"Value of key logFormat should be 'text' or 'json', is '{logFormat}'. Defaulting to: 'text'")
+            logFormat = "text"
+        return {"level": level, "logFormat": logFormat, "path": self.jsonConfig.get("logFile")}
+
+    def getHttpTimeout(self):
+        return self.__getPositiveNumber("httpTimeout", 30, float)
+
+    def getStreamingDiscovery(self):
+        return self.jsonConfig.get("streamingDiscovery", False) in (True, "true", "True")
+
+    def getDiscoveryTimeout(self):
+        return self.__getPositiveNumber("discoveryTimeout", 10, float)
+
+    def getPropertyProbing(self):
+        if "propertyProbing" not in self.jsonConfig.keys():
+            return "all"
+        value = self.jsonConfig["propertyProbing"]
+        if value not in ("all", "required"):
+            self.__printOnce(f"Value of key propertyProbing should be 'all' or 'required', is '{value}'. Defaulting to: 'all'")
+            return "all"
+        return value
+
+    def getPropertyCacheSettings(self):
+        if "propertyCache" not in self.jsonConfig.keys():
+            return None
+        settings = self.jsonConfig["propertyCache"]
+        if type(settings) == str:
+            settings = {"path": settings}
+        elif type(settings) != dict or "path" not in settings.keys():
+            utilClass.doPrint(f"Value of key propertyCache should be a path or a JSON-object with key 'path'. Property list cache disabled.")
+            return None
+
+        for key in settings.keys():
+            if key not in ("path", "sampleSize", "maxEntries", "maxAgeDays"):
+                utilClass.doPrint(f"Ignoring unknown key '{key}' in propertyCache")
+        return {
+            "path": settings["path"],
+            "sampleSize": int(settings.get("sampleSize", 2)),
+            "maxEntries": int(settings.get("maxEntries", 1000)),
+            "maxAgeDays": int(settings.get("maxAgeDays", 90))
+        }
+
+    def getScanRecordsDirectory(self):
+        if "scanRecords" not in self.jsonConfig.keys():
+            return None
+        directory = self.jsonConfig["scanRecords"]
+        if type(directory) != str:
+            utilClass.doPrint(f"Value of key scanRecords should be String, is {str(type(directory))}. Incremental scans disabled.")
+            return None
+        return directory
+
+    def getJournalPath(self):
+        path = self.jsonConfig.get("journal", "scanJournal.jsonl")
+        if path in (False, "false", "False", None):
+            return None
+        if type(path) != str:
+            self.__printOnce(f"Value of key journal should be String or false, is {str(type(path))}. Checkpoints disabled.")
+            return None
+        return path
+
+    def getMetricsDirectory(self):
+        if "metrics" not in self.jsonConfig.keys():
+            return None
+        directory = self.jsonConfig["metrics"]
+        if type(directory) != str:
+            utilClass.doPrint(f"Value of key metrics should be String, is {str(type(directory))}. Metrics are not written.")
+            return None
+        return directory
+
+    def getRequestLimitSettings(self):
+        settings = self.jsonConfig.get("requestLimit", {})
+        if type(settings) != dict:
+            settings = {"max": settings}
+        maxLimit = self.__toPositiveNumber("max in requestLimit", settings.get("max", 8), 8, int)
+        initialLimit = self.__toPositiveNumber("initial in requestLimit", settings.get("initial", 2), 2, int)
+        return {"initialLimit": initialLimit, "maxLimit": maxLimit}
+
+    def getShardSettings(self):
+        settings = self.jsonConfig.get("shards", 1)
+        if type(settings) != dict:
+            settings = {"count": settings}
+        count = self.__toPositiveNumber("count in shards", settings.get("count", 1), 1, int)
+        if count == 1:
+            return None
+        port = self.__toPositiveNumber("port in shards", settings.get("port", 47809), 47809, int)
+        interfaces = settings.get("interfaces", [])
+        if type(interfaces) != list:
+            self.__printOnce(f"Value of key interfaces in shards should be a list, is '{interfaces}'. Using the default interface.")
+            interfaces = []
+        return {"count": count, "port": port, "interfaces": interfaces}
+
+    def getLiveDataSettings(self):
+        settings = self.jsonConfig.get("liveData", {})
+        if type(settings) != dict:
+            self.__printOnce(f"Value of key liveData should be a JSON-object, is {str(type(settings))}. Using the defaults.")
+            settings = {}
+
+        properties = settings.get("properties", ["presentValue"])
+        if type(properties) != list or len(properties) == 0:
+            self.__printOnce(f"Value of key properties in liveData should be a non-empty list, is '{properties}'. Defaulting to: ['presentValue']")
+            properties = ["presentValue"]
+
+        interval = settings.get("interval", 10)
+        if "pollInterval" in self.jsonConfig.keys():
+            interval = self.jsonConfig["pollInterval"]
+        interval = self.__toPositiveNumber("interval in liveData", interval, 10)
+        intervals = {}
+        for key, value in settings.get("intervals", {}).items():
+            intervals[key] = self.__toPositiveNumber(f"intervals.{key} in liveData", value, interval)
+        cov = self.jsonConfig.get("cov", settings.get("cov", False)) in (True, "true", "True")
+        covLifetime = self.__toPositiveNumber("covLifetime in liveData", settings.get("covLifetime", 300), 300, int)
+        return {"properties": [str(prop) for prop in properties], "interval": interval, "intervals": intervals,
+                "cov": cov, "covLifetime": covLifetime}
+
+    def __getPositiveNumber(self, name, default, numberType=int):
+        if name not in self.jsonConfig.keys():
+            return default
+        return self.__toPositiveNumber(name, self.jsonConfig[name], default, numberType)
+
+    def __toPositiveNumber(self, name, value, default, numberType=float):
+        try:
+            value = numberType(value)
+        except (TypeError, ValueError):
+            self.__printOnce(f"Value of key {name} should be a number, is '{value}'. Defaulting to: {default}")
+            return default
+        if value <= 0 or (numberType == int and value < 1):
+            self.__printOnce(f"Value of key {name} should be positive, is {value}. Defaulting to: {default}")
+            return default
+        return value
+
     def getServerUrl(self):
         if "serverUrl" in self.jsonConfig.keys():
             return self.jsonConfig['serverUrl']
@@ -49,7 +255,7 @@ class ConfigManager:
         try:
             var1 = self.jsonConfig[name]
         except KeyError:
-            print(f"No {name} defined in config-file. Defaulting to: empty semantic id.")
+            self.__printOnce(f"No {name} defined in config-file. Defaulting to: empty semantic id.")
             return {"keys": []}
 
         if "keys" in var1.keys():
@@ -79,45 +285,23 @@ class ConfigManager:
         return self.__getSemanticId("semanticIdLiveData")
 
 
-    def getIdAAS(self, deviceName, deviceId):
-        return self.__getId("schemeIdAas", deviceName, deviceId)
-
-    def getIdAID(self, deviceName, deviceId):
-        return self.__getId("schemeIdAid", deviceName, deviceId)
+    def getIdAAS(self, deviceName, deviceId, timestamp=None):
+        return self.__getId("schemeIdAas", deviceName, deviceId, timestamp)
 
-    def getIdAIMC(self, deviceName, deviceId):
-        return self.__getId("schemeIdAimc", deviceName, deviceId)
+    def getIdAID(self, deviceName, deviceId, timestamp=None):
+        return self.__getId("schemeIdAid", deviceName, deviceId, timestamp)
 
-    def getIdLiveData(self, deviceName, deviceId):
-        return self.__getId("schemeIdLiveData", deviceName, deviceId)
+    def getIdAIMC(self, deviceName, deviceId, timestamp=None):
+        return self.__getId("schemeIdAimc", deviceName, deviceId, timestamp)
 
-    def __getId(self, name, deviceName, deviceId):
-        DEFAULT_ID = f"{name}-$timestamp$"
-        if name in self.jsonConfig.keys():
-            var3 = self.jsonConfig[name]
-        else:
-            var3 = {'id': f'{name}-$timestamp$', 'idType': self.DEFAULT_ID_TYPE}
-            utilClass.doPrint(f"No {name} defined in config-file. Defaulting to: '{str(var3)}'")
-
-        if type(var3) == str:
-            return {"id": utilClass.applySchemeId(var3, deviceName, deviceId), "idType": self.DEFAULT_ID_TYPE}
-        elif type(var3) == dict:
-            for key in var3.keys():
-                if key != "id" and key != "idType" and key != "idShort":
-                    utilClass.doPrint(f"Ignoring unknown key '{key}' in {name}")
+    def getIdLiveData(self, deviceName, deviceId, timestamp=None):
+        return self.__getId("schemeIdLiveData", deviceName, deviceId, timestamp)
 
-            var7 = {}
-            if "id" in var3.keys():
-                var7["id"] = utilClass.applySchemeId(var3["id"], deviceName, deviceId)
-            else:
-                var7["id"] = utilClass.applySchemeId(DEFAULT_ID, deviceName, deviceId)
-                utilClass.doPrint(f"No id defined for {name}. Defaulting to: '{var7['id']}'")
-            if "idType" in var3.keys():
-                var7["idType"] = var3["idType"]
-            else:
-                var7["idType"] = self.DEFAULT_ID_TYPE
-                utilClass.doPrint(f"No idType defined for {name}. Defaulting to: '{var7['idType']}'")
-            return var7
+    def __getId(self, name, deviceName, deviceId, timestamp):
+        scheme = self.__getSchemes()[name]
+        if scheme["sharedId"]:
+            timestamp = None
+        return {"id": scheme["id"].apply(deviceName, deviceId, timestamp), "idType": scheme["idType"]}
 
     def getAssetId(self, deviceName, deviceId):
         default = f"bacnet_device_{deviceId}_{deviceName}"
@@ -125,83 +309,206 @@ class ConfigManager:
             assetId = self.jsonConfig["assetId"]
             if type(assetId) == str:
                 return assetId.replace("$deviceName$", deviceName).replace("$deviceId$", str(deviceId))
-            utilClass.doPrint(f"Value of key assetId should be String, is {str(type(assetId))}. Defaulting assetId to: '{default}'")
+            self.__printOnce(f"Value of key assetId should be String, is {str(type(assetId))}. Defaulting assetId to: 'bacnet_device_$deviceId$_$deviceName$'")
             return default
 
-    def getIdShortAAS(self, deviceName, deviceId):
-        var11 = self.__getIdShort("schemeIdAas", deviceName, deviceId)
-        return var11.replace("$deviceName$", deviceName).replace("$deviceId$", str(deviceId))
-    def getIdShortAID(self, deviceName, deviceId):
-        return self.__getIdShort("schemeIdAid", deviceName, deviceId)
-    def getIdShortAIMC(self, deviceName, deviceId):
-        return self.__getIdShort("schemeIdAimc", deviceName, deviceId)
-    def getIdShortLiveData(self, deviceName, deviceId):
-        return self.__getIdShort("schemeIdLiveData", deviceName, deviceId)
-
-    def __getIdShort(self, name, deviceName, deviceId):
-        defaults = {
+    def getIdShortAAS(self, deviceName, deviceId, timestamp=None):
+        return self.__getIdShort("schemeIdAas", deviceName, deviceId, timestamp)
+    def getIdShortAID(self, deviceName, deviceId, timestamp=None):
+        return self.__getIdShort("schemeIdAid", deviceName, deviceId, timestamp)
+    def getIdShortAIMC(self, deviceName, deviceId, timestamp=None):
+        return self.__getIdShort("schemeIdAimc", deviceName, deviceId, timestamp)
+    def getIdShortLiveData(self, deviceName, deviceId, timestamp=None):
+        return self.__getIdShort("schemeIdLiveData", deviceName, deviceId, timestamp)
+
+    def __getIdShort(self, name, deviceName, deviceId, timestamp):
+        return self.__getSchemes()[name]["idShort"].apply(deviceName, deviceId, timestamp)
+
+    def __getSchemes(self):
+        # The schemes are checked and compiled on first use, so their warnings are printed once per run
+        with self.__lock:
+            if self.__schemes is None:
+                schemes = {name: self.__compileScheme(name) for name in self.SCHEME_NAMES}
+                self.__markSharedIds(schemes)
+                self.__schemes = schemes
+            return self.__schemes
+
+    def __compileScheme(self, name):
+        DEFAULT_ID = f"{name}-$timestamp$"
+        defaultIdShorts = {
             "schemeIdAas": "$deviceName$($deviceId$)",
             "schemeIdAid": "AssetInterfacesDescription",
             "schemeIdAimc": "AssetInterfaceMappingConfiguration",
             "schemeIdLiveData": "BACnetDatapointsInformation"
         }
-        if name in self.jsonConfig.keys():
-            var9 = self.jsonConfig[name]
-            if type(var9) == dict:
-                if "idShort" in var9.keys():
-                    return utilClass.applySchemeId(var9["idShort"], deviceName, deviceId)
-                else:
-                    utilClass.doPrint(f"No idShort defined for {name} in config-file. Defaulting to: '{defaults[name]}'")
-                    return utilClass.applySchemeId(defaults[name], deviceName, deviceId)
+        scheme = {"id": DEFAULT_ID, "idType": self.DEFAULT_ID_TYPE, "idShort": defaultIdShorts[name]}
+
+        if name not in self.jsonConfig.keys():
+            utilClass.doPrint(f"No {name} defined in config-file. Defaulting to: '{str({'id': DEFAULT_ID, 'idType': self.DEFAULT_ID_TYPE})}'")
+            utilClass.doPrint(f"No {name} defined in config-file. Defaulting idShort to: '{scheme['idShort']}'")
+        elif type(self.jsonConfig[name]) == str:
+            scheme["id"] = self.jsonConfig[name]
+            utilClass.doPrint(f"Value of key {name} should be JSON-object, is {str(type(self.jsonConfig[name]))}. Defaulting idShort to: '{scheme['idShort']}'")
+        elif type(self.jsonConfig[name]) == dict:
+            var3 = self.jsonConfig[name]
+            for key in var3.keys():
+                if key != "id" and key != "idType" and key != "idShort":
+                    utilClass.doPrint(f"Ignoring unknown key '{key}' in {name}")
+
+            if "id" in var3.keys():
+                scheme["id"] = var3["id"]
+            else:
+                utilClass.doPrint(f"No id defined for {name}. Defaulting to: '{DEFAULT_ID}'")
+            if "idType" in var3.keys():
+                scheme["idType"] = var3["idType"]
             else:
-                utilClass.doPrint(f"Value of key {name} should be JSON-object, is {str(type(var9))}. Defaulting idShort to: '{defaults[name]}'")
-                return utilClass.applySchemeId(defaults[name], deviceName, deviceId)
+                utilClass.doPrint(f"No idType defined for {name}. Defaulting to: '{self.DEFAULT_ID_TYPE}'")
+            if "idShort" in var3.keys():
+                scheme["idShort"] = var3["idShort"]
+            else:
+                utilClass.doPrint(f"No idShort defined for {name} in config-file. Defaulting to: '{scheme['idShort']}'")
         else:
-            utilClass.doPrint(f"No {name} defined in config-file. Defaulting idShort to: '{defaults[name]}'")
-            return utilClass.applySchemeId(defaults[name], deviceName, deviceId)
+            utilClass.doPrint(f"Value of key {name} should be JSON-object, is {str(type(self.jsonConfig[name]))}. Defaulting to: '{DEFAULT_ID}'")
+
+        scheme["id"] = SchemeTemplate(scheme["id"])
+        scheme["idShort"] = SchemeTemplate(scheme["idShort"])
+        scheme["sharedId"] = False
+        return scheme
+
+    def __markSharedIds(self, schemes):
+        # Identical id schemes only differ by their timestamps, which therefore cannot be shared by all ids of a device
+        names = {}
+        for name, scheme in schemes.items():
+            names.setdefault(scheme["id"].scheme, []).append(name)
+        for idScheme, sharingNames in names.items():
+            if len(sharingNames) > 1 and schemes[sharingNames[0]]["id"].usesTime:
+                for name in sharingNames:
+                    schemes[name]["sharedId"] = True
+                utilClass.doPrint(f"{', '.join(sharingNames)} use the same id scheme '{idScheme}'. "
+                                  f"Its timestamp is taken for every id instead of once per device.")
+
+    def __printOnce(self, message):
+        with self.__lock:
+            if message in self.__printed:
+                return
+            self.__printed.add(message)
+        utilClass.doPrint(message)
+
+
+class SchemeTimestamp:
+    """Values of the time placeholders of the schemes, taken once so that all ids of a device share them."""
+    __slots__ = ("values",)
+
+    def __init__(self):
+        time_ns = str(time.time_ns())
+        st = time.localtime()
+        self.values = {
+            "timestamp": time_ns,
+            "timestamp_ns": time_ns,
+            "timestamp_ms": time_ns[:-3],
+            "timestamp_s": time_ns[:-6],
+            "day": str(st.tm_mday),
+            "month": str(st.tm_mon),
+            "year": str(st.tm_year),
+            "hour": str(st.tm_hour),
+            "min": str(st.tm_min),
+            "sec": str(st.tm_sec)
+        }
+
+
+class SchemeTemplate:
+    """Scheme split once into its literal parts and placeholders (see placeholders_for_schemes.txt)."""
+    PLACEHOLDER = re.compile(r"\$(timestamp|timestamp_ns|timestamp_ms|timestamp_s|day|month|year|hour|min|sec|deviceName|deviceId)\$")
+    __slots__ = ("scheme", "parts", "usesTime")
+
+    def __init__(self, scheme: str):
+        self.scheme = scheme
+        # Odd indices are placeholder names, even indices the literal text between them
+        self.parts = self.PLACEHOLDER.split(scheme)
+        self.usesTime = any(part not in ("deviceName", "deviceId") for part in self.parts[1::2])
+
+    def apply(self, deviceName, deviceId, timestamp: SchemeTimestamp = None) -> str:
+        if len(self.parts) == 1:
+            return self.scheme
+        if timestamp is None and self.usesTime:
+            timestamp = SchemeTimestamp()
+        result = []
+        for index, part in enumerate(self.parts):
+            if index % 2 == 0:
+                result.append(part)
+            elif part == "deviceName":
+                result.append(str(deviceName))
+            elif part == "deviceId":
+                result.append(str(deviceId))
+            else:
+                result.append(timestamp.values[part])
+        return "".join(result)
+
+
+class ObjectListStream:
+    """objectList of a device whose length is known up front while its objects are only read when it is iterated.
+    Objects already read are kept, so it can be iterated again like a list."""
+
+    def __init__(self, length: int, objects):
+        self.length = length
+        if type(objects) == list:
+            # Read at once
+            self.objects = objects
+            self.__pending = None
+        else:
+            self.objects = []
+            self.__pending = iter(objects)
+
+    def __len__(self):
+        return self.length
+
+    def isComplete(self):
+        """Whether every object was read, so that iterating does not send requests anymore."""
+        return self.__pending is None
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index < len(self.objects):
+                yield self.objects[index]
+                index += 1
+                continue
+            if self.__pending is None:
+                return
+            try:
+                self.objects.append(next(self.__pending))
+            except StopIteration:
+                self.__pending = None
+                # Objects that could not be read are missing from the list
+                self.length = len(self.objects)
 
 
 class utilClass:
     @staticmethod
-    def doPrint(string, end="\n", newline=False):
-        date_time = datetime.fromtimestamp(time.time())
-        timestamp = date_time.strftime("%Y-%m-%d %H:%M:%S,%f")[:-3]
+    def setDeviceContext(label):
+        logBackend.setDeviceContext(label)
 
-        if newline:
-            print(f"\n{timestamp} - INFO    | {string}", end=end)
-        else:
-            print(f"{timestamp} - INFO    | {string}", end=end)
+    @staticmethod
+    def getDeviceContext():
+        return logBackend.getDeviceContext()
+
+    @staticmethod
+    def doPrint(string, end="\n", newline=False, level=logging.INFO, **fields):
+        logBackend.log(str(string), level, end, newline, **fields)
 
 
     @staticmethod
     def applySchemeId(scheme, deviceName, deviceId):
         if type(scheme) == str:
-            return utilClass.__applyScheme(scheme, deviceName, deviceId)
+            return SchemeTemplate(scheme).apply(deviceName, deviceId)
         elif type(scheme) == dict:
             if "id" not in scheme.keys():
                 raise ValueError(f"Provided dictionary does not contain key 'id'")
-            scheme["id"] = utilClass.__applyScheme(scheme["id"], deviceName, deviceId)
+            scheme["id"] = SchemeTemplate(scheme["id"]).apply(deviceName, deviceId)
             return scheme
         else:
             raise ValueError(f"Illegal argument type: {type(scheme)}")
 
-    @staticmethod
-    def __applyScheme(id: str, deviceName, deviceId) -> str:
-        time_ns = str(time.time_ns())
-        st = time.localtime()
-        return id \
-            .replace("$timestamp$", time_ns) \
-            .replace("$timestamp_ns$", time_ns) \
-            .replace("$timestamp_ms$", time_ns[:-3]) \
-            .replace("$timestamp_s$", time_ns[:-6]) \
-            .replace("$day$", str(st.tm_mday)) \
-            .replace("$month$", str(st.tm_mon)) \
-            .replace("$year$", str(st.tm_year)) \
-            .replace("$hour$", str(st.tm_hour)) \
-            .replace("$min$", str(st.tm_min)) \
-            .replace("$sec$", str(st.tm_sec)) \
-            .replace("$deviceName$", str(deviceName)) \
-            .replace("$deviceId$", str(deviceId))
 
 
 protocolServices = {0: "acknowledgeAlarm",
@@ -707,3 +1014,494 @@ propertyNameForId = {
     490: "defaultSubordinateRelationship",
     491: "represents"
 }
+
+propertyIdForName = {name: id for id, name in propertyNameForId.items()}
+
+
+requiredPropertiesForType = {
+    "accessCredential": ["globalIdentifier", "statusFlags", "reliability", "credentialStatus", "reasonForDisable",
+                         "authenticationFactors", "activationTime", "expirationTime", "credentialDisable",
+                         "assignedAccessRights"],
+    "accessDoor": ["presentValue", "statusFlags", "eventState", "reliability", "outOfService", "priorityArray",
+                   "relinquishDefault", "doorPulseTime", "doorExtendedPulseTime", "doorOpenTooLongTime"],
+    "accessPoint": ["statusFlags", "eventState", "reliability", "outOfService", "authenticationStatus",
+                    "activeAuthenticationPolicy", "numberOfAuthenticationPolicies", "authorizationMode",
+                    "accessEvent", "accessEventTag", "accessEventTime", "accessEventCredential", "accessDoors",
+                    "priorityForWriting"],
+    "accessRights": ["globalIdentifier", "statusFlags", "reliability", "enable", "negativeAccessRules",
+                     "positiveAccessRules"],
+    "accessUser": ["globalIdentifier", "statusFlags", "reliability", "userType", "credentials"],
+    "accessZone": ["globalIdentifier", "occupancyState", "statusFlags", "eventState", "reliability", "outOfService",
+                   "entryPoints", "exitPoints"],
+    "accumulator": ["presentValue", "statusFlags", "eventState", "outOfService", "scale", "units", "maxPresValue"],
+    "alertEnrollment": ["presentValue", "eventState", "eventDetectionEnable", "notificationClass"],
+    "analogInput": ["presentValue", "statusFlags", "eventState", "outOfService", "units"],
+    "analogOutput": ["presentValue", "statusFlags", "eventState", "outOfService", "units", "priorityArray",
+                     "relinquishDefault"],
+    "analogValue": ["presentValue", "statusFlags", "eventState", "outOfService", "units"],
+    "auditLog": ["statusFlags", "eventState", "enable", "bufferSize", "logBuffer", "recordCount", "totalRecordCount"],
+    "auditReporter": ["auditLevel", "auditableOperations", "statusFlags", "eventState", "auditSourceReporter",
+                      "auditablePriorityFilter", "issueConfirmedNotifications"],
+    "averaging": ["minimumValue", "averageValue", "maximumValue", "attemptedSamples", "validSamples",
+                  "objectPropertyReference", "windowInterval", "windowSamples"],
+    "binaryInput": ["presentValue", "statusFlags", "eventState", "outOfService", "polarity"],
+    "binaryLightingOutput": ["presentValue", "statusFlags", "outOfService", "blinkWarnEnable", "egressTime",
+                             "egressActive", "priorityArray", "relinquishDefault", "currentCommandPriority"],
+    "binaryOutput": ["presentValue", "statusFlags", "eventState", "outOfService", "polarity", "priorityArray",
+                     "relinquishDefault"],
+    "binaryValue": ["presentValue", "statusFlags", "eventState", "outOfService"],
+    "bitstringValue": ["presentValue", "statusFlags"],
+    "calendar": ["presentValue", "dateList"],
+    "channel": ["presentValue", "lastPriority", "writeStatus", "statusFlags", "outOfService",
+                "listOfObjectPropertyReferences", "channelNumber", "controlGroups"],
+    "characterstringValue": ["presentValue", "statusFlags"],
+    "command": ["presentValue", "inProcess", "allWritesSuccessful", "action", "statusFlags"],
+    "credentialDataInput": ["presentValue", "statusFlags", "outOfService", "supportedFormats", "updateTime"],
+    "datePatternValue": ["presentValue", "statusFlags"],
+    "dateValue": ["presentValue", "statusFlags"],
+    "datetimePatternValue": ["presentValue", "statusFlags"],
+    "datetimeValue": ["presentValue", "statusFlags"],
+    "device": ["systemStatus", "vendorName", "vendorIdentifier", "modelName", "firmwareRevision",
+               "applicationSoftwareVersion", "protocolVersion", "protocolRevision", "protocolServicesSupported",
+               "protocolObjectTypesSupported", "objectList", "maxApduLengthAccepted", "segmentationSupported",
+               "apduTimeout", "numberOfApduRetries", "deviceAddressBinding", "databaseRevision", "statusFlags"],
+    "elevatorGroup": ["machineRoomID", "groupID", "groupMembers"],
+    "escalator": ["statusFlags", "elevatorGroup", "groupID", "installationID", "operationDirection",
+                  "passengerAlarm"],
+    "eventEnrollment": ["eventType", "notifyType", "eventParameters", "objectPropertyReference", "eventState",
+                        "eventEnable", "ackedTransitions", "notificationClass", "eventDetectionEnable",
+                        "statusFlags", "reliability"],
+    "eventLog": ["statusFlags", "eventState", "enable", "stopWhenFull", "bufferSize", "logBuffer", "recordCount",
+                 "totalRecordCount"],
+    "file": ["fileType", "fileSize", "modificationDate", "archive", "readOnly", "fileAccessMethod"],
+    "globalGroup": ["groupMembers", "presentValue", "statusFlags", "eventState", "memberStatusFlags", "outOfService"],
+    "group": ["listOfGroupMembers", "presentValue"],
+    "integerValue": ["presentValue", "statusFlags", "units"],
+    "largeAnalogValue": ["presentValue", "statusFlags", "units"],
+    "lifeSafetyPoint": ["presentValue", "trackingValue", "statusFlags", "eventState", "reliability", "outOfService",
+                        "mode", "acceptedModes", "silenced", "operationExpected"],
+    "lifeSafetyZone": ["presentValue", "trackingValue", "statusFlags", "eventState", "reliability", "outOfService",
+                       "mode", "acceptedModes", "silenced", "operationExpected", "zoneMembers"],
+    "lift": ["trackingValue", "statusFlags", "elevatorGroup", "groupID", "installationID", "passengerAlarm"],
+    "lightingOutput": ["presentValue", "trackingValue", "lightingCommand", "inProgress", "statusFlags",
+                       "outOfService", "blinkWarnEnable", "egressTime", "egressActive", "defaultFadeTime",
+                       "defaultRampRate", "defaultStepIncrement", "priorityArray", "relinquishDefault",
+                       "lightingCommandDefaultPriority"],
+    "loadControl": ["presentValue", "statusFlags", "eventState", "requestedShedLevel", "startTime", "shedDuration",
+                    "dutyWindow", "enable", "expectedShedLevel", "actualShedLevel", "shedLevels",
+                    "shedLevelDescriptions"],
+    "loop": ["presentValue", "statusFlags", "eventState", "outOfService", "updateInterval", "outputUnits",
+             "manipulatedVariableReference", "controlledVariableReference", "controlledVariableValue",
+             "controlledVariableUnits", "setpointReference", "setpoint", "action", "priorityForWriting"],
+    "multiStateInput": ["presentValue", "statusFlags", "eventState", "outOfService", "numberOfStates"],
+    "multiStateOutput": ["presentValue", "statusFlags", "eventState", "outOfService", "numberOfStates",
+                         "priorityArray"],
+    "multiStateValue": ["presentValue", "statusFlags", "eventState", "outOfService", "numberOfStates"],
+    "networkPort": ["statusFlags", "reliability", "outOfService", "networkType", "protocolLevel", "networkNumber",
+                    "networkNumberQuality", "changesPending", "apduLength", "linkSpeed",
+                    "reliabilityEvaluationInhibit"],
+    "networkSecurity": ["baseDeviceSecurityPolicy", "networkAccessSecurityPolicies", "securityTimeWindow",
+                        "packetReorderTime", "distributionKeyRevision", "keySets", "lastKeyServer",
+                        "securityPDUTimeout", "updateKeySetTimeout", "supportedSecurityAlgorithms", "doNotHide"],
+    "notificationClass": ["notificationClass", "priority", "ackRequired", "recipientList",
+                          "reliabilityEvaluationInhibit"],
+    "notificationForwarder": ["statusFlags", "reliability", "outOfService", "recipientList", "subscribedRecipients",
+                              "processIdentifierFilter", "localForwardingOnly"],
+    "octetstringValue": ["presentValue", "statusFlags"],
+    "positiveIntegerValue": ["presentValue", "statusFlags", "units"],
+    "program": ["programState", "programChange", "statusFlags", "outOfService"],
+    "pulseConverter": ["presentValue", "statusFlags", "eventState", "outOfService", "units", "scaleFactor",
+                       "adjustValue", "count", "updateTime", "countChangeTime", "countBeforeChange"],
+    "schedule": ["presentValue", "effectivePeriod", "scheduleDefault", "listOfObjectPropertyReferences",
+                 "priorityForWriting", "statusFlags", "reliability", "outOfService", "eventState"],
+    "staging": ["presentValue", "presentStage", "stages", "statusFlags", "eventState", "outOfService", "units",
+                "targetReferences", "priorityForWriting", "minPresValue", "maxPresValue"],
+    "structuredView": ["nodeType", "subordinateList"],
+    "timePatternValue": ["presentValue", "statusFlags"],
+    "timeValue": ["presentValue", "statusFlags"],
+    "timer": ["presentValue", "statusFlags", "timerState", "timerRunning"],
+    "trendLog": ["statusFlags", "eventState", "enable", "stopWhenFull", "bufferSize", "logBuffer", "recordCount",
+                 "totalRecordCount", "loggingType"],
+    "trendLogMultiple": ["statusFlags", "eventState", "enable", "logDeviceObjectProperty", "loggingType",
+                         "logInterval", "stopWhenFull", "bufferSize", "logBuffer", "recordCount", "totalRecordCount"]
+}
+
+
+optionalPropertiesForType = {
+    "accessCredential": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "daysRemaining", "usesRemaining", "absenteeLimit", "belongsTo",
+                         "lastAccessPoint", "lastAccessEvent", "lastUseTime", "traceFlag", "threatAuthority",
+                         "extendedTimeEnable", "authorizationExemptions", "reliabilityEvaluationInhibit"],
+    "accessDoor": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                   "doorStatus", "lockStatus", "securedStatus", "doorMembers", "doorUnlockDelayTime",
+                   "doorAlarmState", "maskedAlarmValues", "maintenanceRequired", "timeDelay", "notificationClass",
+                   "alarmValues", "faultValues", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                   "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                   "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                   "reliabilityEvaluationInhibit", "currentCommandPriority", "valueSource", "valueSourceArray",
+                   "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "accessPoint": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "authenticationPolicyList", "authenticationPolicyNames", "verificationTime", "lockout",
+                    "lockoutRelinquishTime", "failedAttempts", "failedAttemptEvents", "maxFailedAttempts",
+                    "failedAttemptsTime", "threatLevel", "occupancyUpperLimitEnforced",
+                    "occupancyLowerLimitEnforced", "occupancyCountAdjust", "accompanimentTime",
+                    "accessEventAuthenticationFactor", "musterPoint", "zoneTo", "zoneFrom", "notificationClass",
+                    "transactionNotificationClass", "accessAlarmEvents", "accessTransactionEvents", "eventEnable",
+                    "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                    "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                    "eventAlgorithmInhibit", "reliabilityEvaluationInhibit"],
+    "accessRights": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                     "accompaniment", "reliabilityEvaluationInhibit"],
+    "accessUser": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                   "userName", "userExternalIdentifier", "userInformationReference", "members", "memberOf",
+                   "reliabilityEvaluationInhibit"],
+    "accessZone": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                   "occupancyCount", "occupancyCountEnable", "adjustValue", "occupancyUpperLimit",
+                   "occupancyLowerLimit", "credentialsInZone", "lastCredentialAdded", "lastCredentialAddedTime",
+                   "lastCredentialRemoved", "lastCredentialRemovedTime", "passbackMode", "passbackTimeout",
+                   "timeDelay", "notificationClass", "alarmValues", "eventEnable", "ackedTransitions", "notifyType",
+                   "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                   "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                   "reliabilityEvaluationInhibit"],
+    "accumulator": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "deviceType", "reliability", "prescale", "valueChangeTime", "valueBeforeChange", "valueSet",
+                    "loggingRecord", "loggingObject", "pulseRate", "highLimit", "lowLimit",
+                    "limitMonitoringInterval", "notificationClass", "timeDelay", "limitEnable", "eventEnable",
+                    "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                    "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                    "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit", "faultHighLimit",
+                    "faultLowLimit"],
+    "alertEnrollment": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                        "profileLocation", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                        "eventMessageTexts", "eventMessageTextsConfig", "eventAlgorithmInhibitRef",
+                        "eventAlgorithmInhibit"],
+    "analogInput": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "deviceType", "reliability", "updateInterval", "minPresValue", "maxPresValue", "resolution",
+                    "covIncrement", "timeDelay", "notificationClass", "highLimit", "lowLimit", "deadband",
+                    "limitEnable", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                    "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                    "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                    "reliabilityEvaluationInhibit", "interfaceValue", "faultHighLimit", "faultLowLimit"],
+    "analogOutput": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                     "deviceType", "reliability", "minPresValue", "maxPresValue", "resolution", "covIncrement",
+                     "timeDelay", "notificationClass", "highLimit", "lowLimit", "deadband", "limitEnable",
+                     "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                     "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                     "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit", "interfaceValue",
+                     "currentCommandPriority", "valueSource", "valueSourceArray", "lastCommandTime",
+                     "commandTimeArray", "auditablePriorityFilter"],
+    "analogValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "reliability", "minPresValue", "maxPresValue", "resolution", "priorityArray",
+                    "relinquishDefault", "covIncrement", "timeDelay", "notificationClass", "highLimit", "lowLimit",
+                    "deadband", "limitEnable", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                    "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                    "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                    "reliabilityEvaluationInhibit", "faultHighLimit", "faultLowLimit", "currentCommandPriority",
+                    "valueSource", "valueSourceArray", "lastCommandTime", "commandTimeArray",
+                    "auditablePriorityFilter"],
+    "auditLog": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                 "reliability", "memberOf", "deleteOnForward", "issueConfirmedNotifications",
+                 "eventDetectionEnable", "notificationClass", "eventEnable", "ackedTransitions", "notifyType",
+                 "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "reliabilityEvaluationInhibit"],
+    "auditReporter": ["description", "profileName", "tags", "profileLocation", "reliability", "monitoredObjects",
+                      "maximumSendDelay", "sendNow", "eventDetectionEnable", "notificationClass", "eventEnable",
+                      "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                      "eventMessageTextsConfig", "reliabilityEvaluationInhibit"],
+    "averaging": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                  "minimumValueTimestamp", "varianceValue", "maximumValueTimestamp"],
+    "binaryInput": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "deviceType", "reliability", "inactiveText", "activeText", "changeOfStateTime",
+                    "changeOfStateCount", "timeOfStateCountReset", "elapsedActiveTime", "timeOfActiveTimeReset",
+                    "timeDelay", "notificationClass", "alarmValue", "eventEnable", "ackedTransitions", "notifyType",
+                    "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                    "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                    "reliabilityEvaluationInhibit", "interfaceValue"],
+    "binaryLightingOutput": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                             "profileLocation", "eventState", "reliability", "feedbackValue", "power", "polarity",
+                             "elapsedActiveTime", "timeOfActiveTimeReset", "strikeCount", "timeOfStrikeCountReset",
+                             "eventDetectionEnable", "notificationClass", "eventEnable", "ackedTransitions",
+                             "notifyType", "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig",
+                             "reliabilityEvaluationInhibit", "valueSource", "valueSourceArray", "lastCommandTime",
+                             "commandTimeArray", "auditablePriorityFilter"],
+    "binaryOutput": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                     "deviceType", "reliability", "inactiveText", "activeText", "changeOfStateTime",
+                     "changeOfStateCount", "timeOfStateCountReset", "elapsedActiveTime", "timeOfActiveTimeReset",
+                     "minimumOffTime", "minimumOnTime", "timeDelay", "notificationClass", "feedbackValue",
+                     "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                     "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                     "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit", "interfaceValue",
+                     "currentCommandPriority", "valueSource", "valueSourceArray", "lastCommandTime",
+                     "commandTimeArray", "auditablePriorityFilter"],
+    "binaryValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "reliability", "inactiveText", "activeText", "changeOfStateTime", "changeOfStateCount",
+                    "timeOfStateCountReset", "elapsedActiveTime", "timeOfActiveTimeReset", "minimumOffTime",
+                    "minimumOnTime", "priorityArray", "relinquishDefault", "timeDelay", "notificationClass",
+                    "alarmValue", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                    "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                    "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                    "reliabilityEvaluationInhibit", "currentCommandPriority", "valueSource", "valueSourceArray",
+                    "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "bitstringValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                       "bitText", "eventState", "reliability", "outOfService", "priorityArray", "relinquishDefault",
+                       "timeDelay", "notificationClass", "alarmValues", "bitMask", "eventEnable",
+                       "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                       "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                       "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit",
+                       "currentCommandPriority", "valueSource", "valueSourceArray", "lastCommandTime",
+                       "commandTimeArray", "auditablePriorityFilter"],
+    "calendar": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation"],
+    "channel": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                "reliability", "executionDelay", "allowGroupDelayInhibit", "eventDetectionEnable",
+                "notificationClass", "eventEnable", "eventState", "ackedTransitions", "notifyType",
+                "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "reliabilityEvaluationInhibit",
+                "valueSource", "auditablePriorityFilter"],
+    "characterstringValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                             "profileLocation", "eventState", "reliability", "outOfService", "priorityArray",
+                             "relinquishDefault", "timeDelay", "notificationClass", "alarmValues", "faultValues",
+                             "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                             "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                             "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                             "reliabilityEvaluationInhibit", "currentCommandPriority", "valueSource",
+                             "valueSourceArray", "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "command": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                "actionText", "eventState", "reliability", "eventDetectionEnable", "notificationClass",
+                "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                "eventMessageTextsConfig", "reliabilityEvaluationInhibit", "valueSource"],
+    "credentialDataInput": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                            "profileLocation", "reliability", "supportedFormatClasses", "eventDetectionEnable",
+                            "notificationClass", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                            "eventMessageTexts", "eventMessageTextsConfig", "reliabilityEvaluationInhibit"],
+    "datePatternValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "eventState", "reliability", "outOfService", "priorityArray",
+                         "relinquishDefault", "reliabilityEvaluationInhibit", "eventDetectionEnable",
+                         "notificationClass", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                         "eventMessageTexts", "eventMessageTextsConfig", "currentCommandPriority", "valueSource",
+                         "valueSourceArray", "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "dateValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                  "eventState", "reliability", "outOfService", "priorityArray", "relinquishDefault",
+                  "reliabilityEvaluationInhibit", "eventDetectionEnable", "notificationClass", "eventEnable",
+                  "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                  "eventMessageTextsConfig", "currentCommandPriority", "valueSource", "valueSourceArray",
+                  "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "datetimePatternValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                             "profileLocation", "eventState", "reliability", "outOfService", "isUTC",
+                             "priorityArray", "relinquishDefault", "reliabilityEvaluationInhibit",
+                             "eventDetectionEnable", "notificationClass", "eventEnable", "ackedTransitions",
+                             "notifyType", "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig",
+                             "currentCommandPriority", "valueSource", "valueSourceArray", "lastCommandTime",
+                             "commandTimeArray", "auditablePriorityFilter"],
+    "datetimeValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                      "eventState", "reliability", "outOfService", "priorityArray", "relinquishDefault", "isUTC",
+                      "reliabilityEvaluationInhibit", "eventDetectionEnable", "notificationClass", "eventEnable",
+                      "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                      "eventMessageTextsConfig", "currentCommandPriority", "valueSource", "valueSourceArray",
+                      "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "device": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+               "location", "structuredObjectList", "vtClassesSupported", "activeVtSessions", "localTime",
+               "localDate", "utcOffset", "daylightSavingsStatus", "apduSegmentTimeout",
+               "timeSynchronizationRecipients", "maxMaster", "maxInfoFrames", "configurationFiles",
+               "lastRestoreTime", "backupFailureTimeout", "backupPreparationTime", "restorePreparationTime",
+               "restoreCompletionTime", "backupAndRestoreState", "activeCovSubscriptions", "maxSegmentsAccepted",
+               "slaveProxyEnable", "autoSlaveDiscovery", "slaveAddressBinding", "manualSlaveAddressBinding",
+               "lastRestartReason", "timeOfDeviceRestart", "restartNotificationRecipients",
+               "utcTimeSynchronizationRecipients", "timeSynchronizationInterval", "alignIntervals",
+               "intervalOffset", "serialNumber", "eventState", "reliability", "eventDetectionEnable",
+               "notificationClass", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+               "eventMessageTexts", "eventMessageTextsConfig", "reliabilityEvaluationInhibit",
+               "activeCovMultipleSubscriptions", "auditNotificationRecipient", "deviceUUID",
+               "deployedProfileLocation"],
+    "elevatorGroup": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                      "groupMode", "landingCalls", "landingCallControl"],
+    "escalator": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                  "powerMode", "escalatorMode", "energyMeter", "energyMeterRef", "reliability", "outOfService",
+                  "faultSignals", "timeDelay", "timeDelayNormal", "eventDetectionEnable", "notificationClass",
+                  "eventEnable", "eventState", "ackedTransitions", "notifyType", "eventTimeStamps",
+                  "eventMessageTexts", "eventMessageTextsConfig", "eventAlgorithmInhibit",
+                  "eventAlgorithmInhibitRef", "reliabilityEvaluationInhibit"],
+    "eventEnrollment": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                        "profileLocation", "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig",
+                        "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal", "faultType",
+                        "faultParameters", "reliabilityEvaluationInhibit"],
+    "eventLog": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                 "reliability", "startTime", "stopTime", "notificationThreshold", "recordsSinceNotification",
+                 "lastNotifyRecord", "notificationClass", "eventEnable", "ackedTransitions", "notifyType",
+                 "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                 "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "reliabilityEvaluationInhibit"],
+    "file": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+             "recordCount"],
+    "globalGroup": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "groupMemberNames", "reliability", "updateInterval", "requestedUpdateInterval",
+                    "covResubscriptionInterval", "clientCovIncrement", "timeDelay", "notificationClass",
+                    "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                    "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                    "eventAlgorithmInhibit", "timeDelayNormal", "covuPeriod", "covuRecipients",
+                    "reliabilityEvaluationInhibit"],
+    "group": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation"],
+    "integerValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                     "eventState", "reliability", "outOfService", "priorityArray", "relinquishDefault",
+                     "covIncrement", "timeDelay", "notificationClass", "highLimit", "lowLimit", "deadband",
+                     "limitEnable", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                     "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                     "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                     "reliabilityEvaluationInhibit", "minPresValue", "maxPresValue", "resolution", "faultHighLimit",
+                     "faultLowLimit", "currentCommandPriority", "valueSource", "valueSourceArray",
+                     "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "largeAnalogValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "eventState", "reliability", "outOfService", "priorityArray",
+                         "relinquishDefault", "covIncrement", "timeDelay", "notificationClass", "highLimit",
+                         "lowLimit", "deadband", "limitEnable", "eventEnable", "ackedTransitions", "notifyType",
+                         "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                         "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                         "reliabilityEvaluationInhibit", "minPresValue", "maxPresValue", "resolution",
+                         "faultHighLimit", "faultLowLimit", "currentCommandPriority", "valueSource",
+                         "valueSourceArray", "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "lifeSafetyPoint": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                        "profileLocation", "deviceType", "timeDelay", "notificationClass", "lifeSafetyAlarmValues",
+                        "alarmValues", "faultValues", "eventEnable", "ackedTransitions", "notifyType",
+                        "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                        "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                        "reliabilityEvaluationInhibit", "maintenanceRequired", "setting", "directReading", "units",
+                        "memberOf", "floorNumber", "valueSource"],
+    "lifeSafetyZone": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                       "deviceType", "timeDelay", "notificationClass", "lifeSafetyAlarmValues", "alarmValues",
+                       "faultValues", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                       "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                       "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "timeDelayNormal",
+                       "reliabilityEvaluationInhibit", "maintenanceRequired", "memberOf", "floorNumber",
+                       "valueSource"],
+    "lift": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+             "floorText", "carDoorText", "assignedLandingCalls", "makingCarCall", "registeredCarCall",
+             "carPosition", "carMovingDirection", "carAssignedDirection", "carDoorStatus", "carDoorCommand",
+             "carDoorZone", "carMode", "carLoad", "carLoadUnits", "nextStoppingFloor", "timeDelay",
+             "timeDelayNormal", "energyMeter", "energyMeterRef", "reliability", "outOfService", "carDriveStatus",
+             "faultSignals", "landingDoorStatus", "higherDeck", "lowerDeck", "eventDetectionEnable",
+             "notificationClass", "eventEnable", "eventState", "ackedTransitions", "notifyType", "eventTimeStamps",
+             "eventMessageTexts", "eventMessageTextsConfig", "eventAlgorithmInhibitRef", "eventAlgorithmInhibit",
+             "reliabilityEvaluationInhibit"],
+    "lightingOutput": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                       "reliability", "transition", "feedbackValue", "power", "instantaneousPower",
+                       "minActualValue", "maxActualValue", "covIncrement", "reliabilityEvaluationInhibit",
+                       "currentCommandPriority", "valueSource", "valueSourceArray", "lastCommandTime",
+                       "commandTimeArray", "auditablePriorityFilter"],
+    "loadControl": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "stateDescription", "reliability", "fullDutyBaseline", "notificationClass", "timeDelay",
+                    "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                    "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                    "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit", "valueSource"],
+    "loop": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+             "reliability", "proportionalConstant", "proportionalConstantUnits", "integralConstant",
+             "integralConstantUnits", "derivativeConstant", "derivativeConstantUnits", "bias", "maximumOutput",
+             "minimumOutput", "covIncrement", "timeDelay", "notificationClass", "errorLimit", "deadband",
+             "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+             "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef", "eventAlgorithmInhibit",
+             "timeDelayNormal", "reliabilityEvaluationInhibit", "lowDiffLimit"],
+    "multiStateInput": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                        "profileLocation", "deviceType", "reliability", "stateText", "timeDelay",
+                        "notificationClass", "alarmValues", "faultValues", "eventEnable", "ackedTransitions",
+                        "notifyType", "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig",
+                        "eventDetectionEnable", "eventAlgorithmInhibitRef", "eventAlgorithmInhibit",
+                        "timeDelayNormal", "reliabilityEvaluationInhibit", "interfaceValue"],
+    "multiStateOutput": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "deviceType", "reliability", "stateText", "relinquishDefault",
+                         "timeDelay", "notificationClass", "feedbackValue", "eventEnable", "ackedTransitions",
+                         "notifyType", "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig",
+                         "eventDetectionEnable", "eventAlgorithmInhibitRef", "eventAlgorithmInhibit",
+                         "timeDelayNormal", "reliabilityEvaluationInhibit", "interfaceValue",
+                         "currentCommandPriority", "valueSource", "valueSourceArray", "lastCommandTime",
+                         "commandTimeArray", "auditablePriorityFilter"],
+    "multiStateValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                        "profileLocation", "reliability", "stateText", "priorityArray", "relinquishDefault",
+                        "timeDelay", "notificationClass", "alarmValues", "faultValues", "eventEnable",
+                        "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                        "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                        "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit", "valueSource",
+                        "valueSourceArray", "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "networkPort": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                    "referencePort", "command", "macAddress", "linkSpeeds", "linkSpeedAutonegotiate",
+                    "networkInterfaceName", "bacnetIPMode", "ipAddress", "bacnetIPUDPPort", "ipSubnetMask",
+                    "ipDefaultGateway", "bacnetIPMulticastAddress", "ipDNSServer", "ipDHCPEnable",
+                    "ipDHCPLeaseTime", "ipDHCPLeaseTimeRemaining", "ipDHCPServer", "bacnetIPNATTraversal",
+                    "bacnetIPGlobalAddress", "bbmdBroadcastDistributionTable", "bbmdAcceptFDRegistrations",
+                    "bbmdForeignDeviceTable", "fdBBMDAddress", "fdSubscriptionLifetime", "bacnetIPv6Mode",
+                    "ipv6Address", "ipv6PrefixLength", "bacnetIPv6UDPPort", "ipv6DefaultGateway",
+                    "bacnetIPv6MulticastAddress", "ipv6DNSServer", "ipv6AutoAddressingEnable", "ipv6DHCPLeaseTime",
+                    "ipv6DHCPLeaseTimeRemaining", "ipv6DHCPServer", "ipv6ZoneIndex", "maxMaster", "maxInfoFrames",
+                    "slaveProxyEnable", "manualSlaveAddressBinding", "autoSlaveDiscovery", "slaveAddressBinding",
+                    "virtualMACAddressTable", "routingTable", "eventDetectionEnable", "notificationClass",
+                    "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                    "eventMessageTextsConfig", "eventState"],
+    "networkSecurity": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation"],
+    "notificationClass": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                          "profileLocation", "statusFlags", "eventState", "reliability", "eventDetectionEnable",
+                          "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                          "eventMessageTextsConfig"],
+    "notificationForwarder": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                              "profileLocation", "portFilter", "reliabilityEvaluationInhibit"],
+    "octetstringValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "eventState", "reliability", "outOfService", "priorityArray",
+                         "relinquishDefault", "currentCommandPriority", "valueSource", "valueSourceArray",
+                         "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "positiveIntegerValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                             "profileLocation", "eventState", "reliability", "outOfService", "priorityArray",
+                             "relinquishDefault", "covIncrement", "timeDelay", "notificationClass", "highLimit",
+                             "lowLimit", "deadband", "limitEnable", "eventEnable", "ackedTransitions", "notifyType",
+                             "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig",
+                             "eventDetectionEnable", "eventAlgorithmInhibitRef", "eventAlgorithmInhibit",
+                             "timeDelayNormal", "reliabilityEvaluationInhibit", "minPresValue", "maxPresValue",
+                             "resolution", "faultHighLimit", "faultLowLimit", "currentCommandPriority",
+                             "valueSource", "valueSourceArray", "lastCommandTime", "commandTimeArray",
+                             "auditablePriorityFilter"],
+    "program": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                "reasonForHalt", "descriptionOfHalt", "programLocation", "instanceOf", "reliability",
+                "eventDetectionEnable", "notificationClass", "eventEnable", "ackedTransitions", "notifyType",
+                "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "reliabilityEvaluationInhibit"],
+    "pulseConverter": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                       "inputReference", "reliability", "covIncrement", "covPeriod", "notificationClass",
+                       "timeDelay", "highLimit", "lowLimit", "deadband", "limitEnable", "eventEnable",
+                       "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                       "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                       "eventAlgorithmInhibit", "timeDelayNormal", "reliabilityEvaluationInhibit"],
+    "schedule": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                 "weeklySchedule", "exceptionSchedule", "eventDetectionEnable", "notificationClass", "eventEnable",
+                 "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                 "eventMessageTextsConfig", "reliabilityEvaluationInhibit"],
+    "staging": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                "stageNames", "reliability", "defaultPresentValue", "covIncrement", "notificationClass",
+                "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                "eventMessageTextsConfig", "eventDetectionEnable", "reliabilityEvaluationInhibit", "valueSource"],
+    "structuredView": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                       "nodeSubtype", "subordinateAnnotations", "subordinateTags", "subordinateNodeTypes",
+                       "subordinateRelationships", "defaultSubordinateRelationship", "represents"],
+    "timePatternValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "eventState", "reliability", "outOfService", "priorityArray",
+                         "relinquishDefault", "reliabilityEvaluationInhibit", "eventDetectionEnable",
+                         "notificationClass", "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps",
+                         "eventMessageTexts", "eventMessageTextsConfig", "currentCommandPriority", "valueSource",
+                         "valueSourceArray", "lastCommandTime", "commandTimeArray", "auditablePriorityFilter"],
+    "timeValue": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                  "eventState", "reliability", "outOfService", "priorityArray", "relinquishDefault",
+                  "eventDetectionEnable", "notificationClass", "eventEnable", "ackedTransitions", "notifyType",
+                  "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "currentCommandPriority",
+                  "valueSource", "valueSourceArray", "lastCommandTime", "commandTimeArray",
+                  "auditablePriorityFilter"],
+    "timer": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+              "eventState", "reliability", "outOfService", "updateTime", "lastStateChange", "expirationTime",
+              "initialTimeout", "defaultTimeout", "minPresValue", "maxPresValue", "resolution", "stateChangeValues",
+              "listOfObjectPropertyReferences", "priorityForWriting", "eventDetectionEnable", "notificationClass",
+              "timeDelay", "timeDelayNormal", "alarmValues", "eventEnable", "ackedTransitions", "notifyType",
+              "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventAlgorithmInhibitRef",
+              "eventAlgorithmInhibit", "reliabilityEvaluationInhibit"],
+    "trendLog": ["description", "profileName", "auditLevel", "auditableOperations", "tags", "profileLocation",
+                 "reliability", "startTime", "stopTime", "logDeviceObjectProperty", "logInterval",
+                 "covResubscriptionInterval", "clientCovIncrement", "alignIntervals", "intervalOffset", "trigger",
+                 "notificationThreshold", "recordsSinceNotification", "lastNotifyRecord", "notificationClass",
+                 "eventEnable", "ackedTransitions", "notifyType", "eventTimeStamps", "eventMessageTexts",
+                 "eventMessageTextsConfig", "eventDetectionEnable", "eventAlgorithmInhibitRef",
+                 "eventAlgorithmInhibit", "reliabilityEvaluationInhibit"],
+    "trendLogMultiple": ["description", "profileName", "auditLevel", "auditableOperations", "tags",
+                         "profileLocation", "reliability", "startTime", "stopTime", "alignIntervals",
+                         "intervalOffset", "trigger", "notificationThreshold", "recordsSinceNotification",
+                         "lastNotifyRecord", "notificationClass", "eventEnable", "ackedTransitions", "notifyType",
+                         "eventTimeStamps", "eventMessageTexts", "eventMessageTextsConfig", "eventDetectionEnable",
+                         "eventAlgorithmInhibitRef", "eventAlgorithmInhibit", "reliabilityEvaluationInhibit"]
+}